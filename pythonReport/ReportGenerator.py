@@ -1,270 +1,2378 @@
 import os
 import sys
-import pandas as pd
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-import tkinter as tk
-from tkinter import filedialog, messagebox
+import time
+STARTED_AT = time.perf_counter()  # For the startup-time measurement; keep this above the other imports
 import random
 import logging
+import logging.handlers
 import traceback
-from PIL import Image, ImageDraw, ImageFont
+import atexit
+import argparse
+import hashlib
+import copy
+import datetime
+import json
+import io
+import re
+import multiprocessing
+import threading
+import queue
+import csv
+import cProfile
+import pstats
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
+class LazyImport:
+    """Stand-in for a heavy module (or a name from one) that is imported on first use
+    
+    pandas, python-docx, PIL and lxml take seconds to import in the packaged EXE,
+    so the window is shown first and they load on the first Generate click, or
+    earlier from warm_up_imports(). The loaders use plain import statements so
+    PyInstaller still finds and bundles the modules.
+    """
+    _lock = threading.Lock()
+    instances = []
+    
+    def __init__(self, loader):
+        self._loader = loader
+        self._target = None
+        LazyImport.instances.append(self)
+    
+    def resolve(self):
+        if self._target is None:
+            with LazyImport._lock:
+                if self._target is None:
+                    self._target = self._loader()
+        return self._target
+    
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+    
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+@LazyImport
+def pd():
+    import pandas
+    return pandas
+
+@LazyImport
+def openpyxl():
+    import openpyxl
+    return openpyxl
+
+@LazyImport
+def Document():
+    from docx import Document
+    return Document
+
+@LazyImport
+def Inches():
+    from docx.shared import Inches
+    return Inches
+
+@LazyImport
+def Pt():
+    from docx.shared import Pt
+    return Pt
+
+@LazyImport
+def RGBColor():
+    from docx.shared import RGBColor
+    return RGBColor
+
+@LazyImport
+def Emu():
+    from docx.shared import Emu
+    return Emu
+
+@LazyImport
+def WD_PARAGRAPH_ALIGNMENT():
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+    return WD_PARAGRAPH_ALIGNMENT
+
+@LazyImport
+def Image():
+    from PIL import Image
+    return Image
+
+@LazyImport
+def ImageDraw():
+    from PIL import ImageDraw
+    return ImageDraw
+
+@LazyImport
+def ImageFont():
+    from PIL import ImageFont
+    return ImageFont
+
+@LazyImport
+def ImageOps():
+    from PIL import ImageOps
+    return ImageOps
+
+@LazyImport
+def etree():
+    from lxml import etree
+    return etree
+
+# tkinter is only needed by the window, not by the command line or the worker processes
+@LazyImport
+def tk():
+    import tkinter
+    return tkinter
+
+@LazyImport
+def filedialog():
+    from tkinter import filedialog
+    return filedialog
+
+@LazyImport
+def messagebox():
+    from tkinter import messagebox
+    return messagebox
+
+@LazyImport
+def ttk():
+    from tkinter import ttk
+    return ttk
+
+def warm_up_imports():
+    """Import every lazily loaded module now, e.g. from a background thread while the window is idle"""
+    started = time.perf_counter()
+    for lazy_import in LazyImport.instances:
+        lazy_import.resolve()
+    logging.info(f"Warm-up imports finished in {time.perf_counter() - started:.2f}s")
 
 # Configure logging
-def configure_logging():
-    log_file = os.path.join(os.getcwd(), 'report_generator.log')
-    logging.basicConfig(
-        filename=log_file,
-        level=logging.DEBUG,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
+LOG_FILE_NAME = 'report_generator.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+# Set REPORT_GENERATOR_LOG_LEVEL=DEBUG (or --log-level DEBUG) to log every claim's stage timings
+DEFAULT_LOG_LEVEL = os.environ.get('REPORT_GENERATOR_LOG_LEVEL', 'INFO').upper()
+# Attributes passed with extra= that are written as their own keys in the JSON log
+LOG_FIELDS = ('claim', 'stage', 'duration', 'status')
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record: time, level, process, message, any LOG_FIELDS and the traceback"""
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'process': record.process,
+            'message': record.getMessage(),
+        }
+        for field in LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = round(value, 6) if field == 'duration' else value
+        if record.exc_info:
+            record.exc_text = record.exc_text or self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['error'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback out of the message, so it gets its own JSON key"""
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+# Records from every thread and worker process go through this queue to one listener thread
+_log_queue = None
+_log_listener = None
+
+def configure_logging(level=None):
+    """Log through a queue to a rotating JSON-lines file, written by a background listener thread
+    
+    Logging calls only enqueue the record, so generation never waits on the log
+    file. Worker processes log into the same queue (see configure_worker_logging).
+    """
+    global _log_queue, _log_listener
+    if _log_listener is None:
+        _log_queue = multiprocessing.Queue()
+        handler = logging.handlers.RotatingFileHandler(
+            os.path.join(os.getcwd(), LOG_FILE_NAME), maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+        handler.setFormatter(JsonLineFormatter())
+        _log_listener = logging.handlers.QueueListener(_log_queue, handler)
+        _log_listener.start()
+        atexit.register(stop_logging)
+    configure_worker_logging(_log_queue, level or DEFAULT_LOG_LEVEL)
     logging.info("Application started")
 
-class ReportGenerator:
-    def __init__(self):
+def configure_worker_logging(log_queue, level):
+    """Send this process's records to log_queue instead of any inherited handlers"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(RecordQueueHandler(log_queue))
+    root.setLevel(level)
+
+def stop_logging():
+    """Write out the queued records and stop the listener thread"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Outcome of a single claim in a batch; status is "success", "skipped" (unchanged) or "failed"
+# metrics is the ClaimMetrics of the build, None for skipped claims
+ClaimResult = namedtuple('ClaimResult', ['index', 'claim', 'status', 'path', 'error', 'metrics'], defaults=(None,))
+
+# Rows read and normalized together from .csv and .xlsx input
+CLAIM_BLOCK_ROWS = 500
+
+# One claim row after normalization, as consumed by the report builders. Every field is already
+# filled with its default; dates hold the text printed in the report (see normalize_date);
+# scope_items are the SCOPE OF WORK bullets.
+ClaimRecord = namedtuple('ClaimRecord', [
+    'claim_number', 'insured', 'address', 'insurer', 'adjuster', 'loss_type', 'cause',
+    'inspection_date', 'loss_date', 'report_date', 'scope_items', 'filename',
+])
+
+# Column -> (record field, default when the cell is empty)
+TEXT_COLUMNS = {
+    'CLAIM #': ('claim_number', 'PR0000'),
+    'INSURED/POLICYHOLDER': ('insured', 'Unknown'),
+    'ADDRESS': ('address', 'Unknown'),
+    'INSURER': ('insurer', 'Unknown'),
+    'ADJUSTER/ CLAIM REP': ('adjuster', 'Unknown'),
+    'TYPE OF LOSS': ('loss_type', 'Unknown'),
+    'CAUSE OF LOSS': ('cause', 'Unknown cause of loss'),
+}
+DATE_COLUMNS = {
+    'DATE OF INSPECTION': 'inspection_date',
+    'DATE OF LOSS': 'loss_date',
+    'DATE OF REPORT': 'report_date',
+}
+
+def blank_to_na(column):
+    """Empty and whitespace-only cells become missing so column defaults apply"""
+    column = column.astype(object)
+    return column.where(column.notna() & (column.astype(str).str.strip() != ''))
+
+def column_or_missing(df, name):
+    if name in df.columns:
+        return blank_to_na(df[name])
+    return pd.Series(None, index=df.index, dtype=object)
+
+def as_text(column):
+    """Cell values as a string-dtype column, keeping missing cells missing"""
+    return column.map(str, na_action='ignore').astype('string')
+
+def split_items(column, separator):
+    """One row per non-empty, stripped item, indexed by the row it came from"""
+    items = column.str.split(separator, regex=False).explode().str.strip()
+    return items[items.notna() & (items != '')]
+
+def normalize_scope(column):
+    """SCOPE OF WORK cells -> tuple of bullet texts per row
+    
+    Items are split on <br> tags, or on line breaks when there is at most one <br>
+    item, and leading numbering ("1. ") is dropped.
+    """
+    column = column.where(column.map(lambda value: isinstance(value, str))).astype('string')
+    br_items = split_items(column, '<br>')
+    br_counts = br_items.groupby(level=0).size().reindex(column.index, fill_value=0)
+    by_line = br_counts <= 1
+    items = pd.concat([br_items[~by_line.reindex(br_items.index).to_numpy()],
+                       split_items(column[by_line], '\n')]).sort_index(kind='stable')
+    numbered = items.str.contains('.', regex=False)
+    items = items.where(~numbered, items.str.split('.', n=1).str[-1].str.strip())
+    scope = items.groupby(level=0).agg(tuple).reindex(column.index)
+    return scope.map(lambda value: value if isinstance(value, tuple) else ())
+
+def normalize_date(column):
+    """Text printed for a date column, filled with 'Unknown'
+    
+    Cells the spreadsheet stores as dates are printed like "MARCH 5, 2025", the way
+    the claim sheets write them by hand. Text cells ("MARCH 5, 2025", "TBD") are
+    printed as entered: guessing at them could swap day and month.
+    """
+    is_date = column.map(lambda value: isinstance(value, datetime.date))
+    dates = pd.to_datetime(column.where(is_date), errors='coerce')
+    formatted = (dates.dt.month_name().str.upper() + ' ' + dates.dt.day.astype('Int64').astype('string')
+                 + ', ' + dates.dt.year.astype('Int64').astype('string'))
+    return formatted.where(is_date.to_numpy(), as_text(column)).fillna('Unknown')
+
+def normalize_claims(df):
+    """Turn a block of raw claim rows into ClaimRecords with whole-column string operations"""
+    df = df.loc[:, [column is not None for column in df.columns]]
+    df.columns = [str(column).strip() for column in df.columns]
+    raw = pd.DataFrame({column: blank_to_na(df[column]) for column in df.columns}, index=df.index)
+    raw = raw.dropna(how='all')
+    if raw.empty:
+        return []
+    
+    fields = {}
+    for column, (field, default) in TEXT_COLUMNS.items():
+        values = column_or_missing(raw, column)
+        fields[field] = as_text(values).fillna(default)
+    for column, field in DATE_COLUMNS.items():
+        fields[field] = normalize_date(column_or_missing(raw, column))
+    fields['scope_items'] = normalize_scope(column_or_missing(raw, 'SCOPE OF WORK'))
+    
+    insured = as_text(column_or_missing(raw, 'INSURED/POLICYHOLDER'))
+    first_name = insured.str.split().str[0].str.upper().fillna('UNKNOWN')
+    address = (as_text(column_or_missing(raw, 'ADDRESS')).fillna('UNKNOWN')
+               .str.replace(',', '', regex=False).str.replace(' ', '_', regex=False))
+    fields['filename'] = ("FIRST INSPECTION REPORT - CLAIM# " + fields['claim_number'] + " - "
+                          + first_name + " - " + address + ".docx")
+    
+    columns = [fields[field].tolist() for field in ClaimRecord._fields]
+    return [ClaimRecord(*values) for values in zip(*columns)]
+
+def iter_excel_claims(input_file_path, block_rows=CLAIM_BLOCK_ROWS):
+    """Stream claim records from an .xlsx workbook using openpyxl's read-only mode, a block of rows at a time"""
+    workbook = openpyxl.load_workbook(input_file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = list(header)
+        block = []
+        for values in rows:
+            block.append(values)
+            if len(block) >= block_rows:
+                yield from normalize_claims(pd.DataFrame(block, columns=columns))
+                block = []
+        if block:
+            yield from normalize_claims(pd.DataFrame(block, columns=columns))
+    finally:
+        workbook.close()
+
+def iter_csv_claims(input_file_path, block_rows=CLAIM_BLOCK_ROWS):
+    """Stream claim records from a .csv file a block of rows at a time"""
+    for block in pd.read_csv(input_file_path, dtype=str, chunksize=block_rows):
+        yield from normalize_claims(block)
+
+def iter_claims(input_file_path):
+    """Yield (row index, ClaimRecord) pairs, normalized a block of rows at a time
+    
+    The first claim is only yielded once its whole block (up to CLAIM_BLOCK_ROWS rows)
+    is read and normalized, so generation starts after that block, not after the
+    first row. Older .xls files are read whole before anything is yielded.
+    """
+    extension = os.path.splitext(input_file_path)[1].lower()
+    if extension == '.csv':
+        records = iter_csv_claims(input_file_path)
+    elif extension in ('.xlsx', '.xlsm'):
+        records = iter_excel_claims(input_file_path)
+    else:
+        # Older formats (.xls) are not supported by openpyxl; read them whole
+        records = iter(normalize_claims(pd.read_excel(input_file_path)))
+    return enumerate(records)
+
+def estimate_claim_count(input_file_path):
+    """Cheap row count for progress display, or None if it can't be known without reading the file"""
+    if os.path.splitext(input_file_path)[1].lower() not in ('.xlsx', '.xlsm'):
+        return None
+    try:
+        workbook = openpyxl.load_workbook(input_file_path, read_only=True)
         try:
-            logging.info("Initializing application")
-            self.root = tk.Tk()
-            self.root.title("First Inspection Report Generator")
-            self.root.geometry("650x450")
-            
-            # GUI Elements
-            tk.Label(self.root, text="First Inspection Report Generator", 
-                     font=("Arial", 16, "bold"), fg="navy").pack(pady=10)
-            
-            # Input file selection
-            file_frame = tk.Frame(self.root)
-            file_frame.pack(fill=tk.X, padx=20, pady=5)
-            tk.Button(file_frame, text="1. Select Input CSV/Excel File", 
-                      command=self.select_input_file, width=25).pack(side=tk.LEFT)
-            self.input_file_label = tk.Label(file_frame, text="No file selected", anchor="w")
-            self.input_file_label.pack(side=tk.LEFT, padx=10, fill=tk.X, expand=True)
-            
-            # Images folder selection
-            img_frame = tk.Frame(self.root)
-            img_frame.pack(fill=tk.X, padx=20, pady=5)
-            tk.Button(img_frame, text="2. Select Images Folder", 
-                      command=self.select_images_folder, width=25).pack(side=tk.LEFT)
-            self.images_folder_label = tk.Label(img_frame, text="No folder selected", anchor="w")
-            self.images_folder_label.pack(side=tk.LEFT, padx=10, fill=tk.X, expand=True)
-            
-            # Output folder selection
-            out_frame = tk.Frame(self.root)
-            out_frame.pack(fill=tk.X, padx=20, pady=5)
-            tk.Button(out_frame, text="3. Select Output Folder", 
-                      command=self.select_output_folder, width=25).pack(side=tk.LEFT)
-            self.output_folder_label = tk.Label(out_frame, text="No folder selected", anchor="w")
-            self.output_folder_label.pack(side=tk.LEFT, padx=10, fill=tk.X, expand=True)
-            
-            # Generate button
-            tk.Button(self.root, text="Generate Reports", command=self.generate_reports,
-                      bg="#4CAF50", fg="white", font=("Arial", 12, "bold"), 
-                      padx=20, pady=10).pack(pady=20)
+            max_row = workbook.worksheets[0].max_row
+        finally:
+            workbook.close()
+        return max_row - 1 if max_row else None
+    except Exception:
+        return None
+
+# Display size of each picture slot in inches (width, height); None keeps the aspect ratio
+PHOTO_BOX = (3.25, 2.25)
+BANNER_BOX = (6, None)
+MAX_ROOM_PHOTOS = 4
+
+DEFAULT_IMAGE_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'report_generator_image_cache')
+DEFAULT_PLACEHOLDER_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'report_generator_placeholder_cache')
+PLACEHOLDER_CACHE_MAX_BYTES = 20 * 1024 * 1024
+IMAGE_CACHE_MAX_BYTES = 500 * 1024 * 1024
+IMAGE_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+IMAGE_CACHE_SUFFIX = '.img'  # Only files with this suffix are ever evicted from the folder
+
+def evict_cache_files(cache_dir, max_bytes, extension):
+    """Delete the least recently used cache entries (files ending in extension) until they fit in max_bytes
+    
+    Caches mark an entry as used by touching its mtime when they read it.
+    """
+    entries = []
+    with os.scandir(cache_dir) as scan:
+        for entry in scan:
+            if entry.is_file() and os.path.splitext(entry.name)[1] == extension:
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+PLACEHOLDER_SUBTITLE = "Photo not available"
+
+class ImageCache:
+    """Photos downscaled to the size they are shown at, shared by every report in a batch
+    
+    Entries are content-addressed by source path, mtime, size and target box, so a
+    photo is decoded once and the same prepared bytes are embedded in every report.
+    With a cache_dir the entries are also shared between worker processes and runs;
+    evict() keeps the folder under max_bytes, like PlaceholderCache. In memory only
+    the most recently used memory_max_bytes of entries are kept.
+    """
+    def __init__(self, cache_dir=None, dpi=200, quality=85, max_bytes=IMAGE_CACHE_MAX_BYTES,
+                 memory_max_bytes=IMAGE_MEMORY_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.dpi = dpi
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self.entries = OrderedDict()
+        self.memory_bytes = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+    
+    def cache_key(self, path, box):
+        stat = os.stat(path)
+        raw = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{box}|{self.dpi}|{self.quality}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, path, box):
+        """Return a stream with the prepared image, or the original path if it can't be prepared"""
+        try:
+            key = self.cache_key(path, box)
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+                return io.BytesIO(data)
+            data = self.load_from_disk(key)
+            if data is None:
+                data = self.prepare(path, box)
+                self.store_on_disk(key, data)
+            self.remember(key, data)
+            return io.BytesIO(data)
+        except Exception as e:
+            logging.error(f"Error preparing image {path}: {str(e)}")
+            return path
+    
+    def remember(self, key, data):
+        """Keep an entry in memory, dropping the least recently used beyond memory_max_bytes"""
+        self.entries[key] = data
+        self.memory_bytes += len(data)
+        while self.memory_bytes > self.memory_max_bytes and len(self.entries) > 1:
+            _, dropped = self.entries.popitem(last=False)
+            self.memory_bytes -= len(dropped)
+    
+    def load_from_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, f"{key}{IMAGE_CACHE_SUFFIX}")
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Mark as recently used for eviction
+            return data
+        except OSError:
+            return None
+    
+    def store_on_disk(self, key, data):
+        if not self.cache_dir:
+            return
+        # Write then rename so concurrent workers never read a partial entry
+        target = os.path.join(self.cache_dir, f"{key}{IMAGE_CACHE_SUFFIX}")
+        temp_path = f"{target}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, target)
+    
+    def evict(self):
+        """Delete least recently used entries until the folder fits in max_bytes
+        
+        Run once at the end of a batch rather than on every store, as it scans the
+        whole folder; the batch's own photos are the most recently used entries.
+        """
+        if not self.cache_dir:
+            return
+        try:
+            evict_cache_files(self.cache_dir, self.max_bytes, IMAGE_CACHE_SUFFIX)
+        except OSError as e:
+            logging.error(f"Error evicting image cache entries: {str(e)}")
+    
+    def prepare(self, path, box):
+        """Decode, apply EXIF orientation, resize to the box at the target DPI and re-encode"""
+        with Image.open(path) as img:
+            source_format = img.format
+            orientation = img.getexif().get(0x0112, 1)
+            img = ImageOps.exif_transpose(img)
             
-            # Status label
-            self.status_label = tk.Label(self.root, text="Ready to generate reports", 
-                                        fg="green", font=("Arial", 10))
-            self.status_label.pack(pady=10)
+            box_width, box_height = box
+            target_width = round(box_width * self.dpi)
+            if box_height is None:
+                target_height = round(img.height * target_width / img.width)
+            else:
+                target_height = round(box_height * self.dpi)
             
-            # Instance variables
-            self.input_file_path = ""
-            self.images_folder_path = ""
-            self.output_folder_path = ""
-            self.placeholder_cache = {}
-            self.header_image_path = None
-            self.footer_image_path = None
+            needs_resize = img.width > target_width or img.height > target_height
+            if not needs_resize and orientation == 1:
+                # Already small enough and upright - embed the original bytes untouched
+                with open(path, 'rb') as f:
+                    return f.read()
+            if needs_resize:
+                img = img.resize((min(img.width, target_width), min(img.height, target_height)),
+                                 Image.LANCZOS)
             
-            logging.info("GUI initialized")
-            self.root.mainloop()
+            output = io.BytesIO()
+            if source_format == 'PNG' or img.mode in ('RGBA', 'LA', 'P'):
+                img.save(output, format='PNG', optimize=True)
+            else:
+                img.convert('RGB').save(output, format='JPEG', quality=self.quality, optimize=True)
+            return output.getvalue()
+
+# Fonts are loaded once per process; truetype lookups are slow and fail the same way every time
+_placeholder_fonts = {}
+
+def get_placeholder_font(name, size):
+    key = (name, size)
+    if key not in _placeholder_fonts:
+        try:
+            _placeholder_fonts[key] = ImageFont.truetype(name, size)
+        except Exception:
+            _placeholder_fonts[key] = ImageFont.load_default()
+    return _placeholder_fonts[key]
+
+def render_placeholder(title, subtitle):
+    """Draw a placeholder image with text and return it as JPEG bytes"""
+    # Create image
+    width, height = 800, 600
+    img = Image.new('RGB', (width, height), color=(230, 230, 230))
+    draw = ImageDraw.Draw(img)
+    
+    # Add border
+    draw.rectangle([(10, 10), (width-10, height-10)], outline=(180, 180, 180), width=3)
+    
+    # Add title
+    title_font = get_placeholder_font("arialbd.ttf", 40)
+    title_width = draw.textlength(title, font=title_font) if hasattr(draw, 'textlength') else 400
+    draw.text(((width - title_width) // 2, height // 3), title, 
+              fill=(100, 100, 100), font=title_font)
+    
+    # Add subtitle
+    subtitle_font = get_placeholder_font("arial.ttf", 30)
+    subtitle_width = draw.textlength(subtitle, font=subtitle_font) if hasattr(draw, 'textlength') else 400
+    draw.text(((width - subtitle_width) // 2, height // 2), subtitle, 
+              fill=(150, 150, 150), font=subtitle_font)
+    
+    # Add camera icon
+    draw.ellipse([(width//2-40, height//1.7-40), (width//2+40, height//1.7+40)], 
+                 outline=(180, 180, 180), width=3)
+    draw.line([(width//2-25, height//1.7-25), (width//2+25, height//1.7+25)], 
+              fill=(180, 180, 180), width=3)
+    draw.line([(width//2-25, height//1.7+25), (width//2+25, height//1.7-25)], 
+              fill=(180, 180, 180), width=3)
+    
+    output = io.BytesIO()
+    img.save(output, format='JPEG')
+    return output.getvalue()
+
+class PlaceholderCache:
+    """Rendered placeholder images keyed by their visible text
+    
+    Rendered in memory and shared by every claim with the same text. With a
+    cache_dir the images also persist between runs; the folder is kept under
+    max_bytes by evicting the least recently used entries.
+    """
+    def __init__(self, cache_dir=None, max_bytes=PLACEHOLDER_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.entries = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+    
+    def get(self, title, subtitle):
+        key = hashlib.sha1(f"{title}\n{subtitle}".encode('utf-8')).hexdigest()
+        data = self.entries.get(key)
+        if data is None:
+            data = self.load_from_disk(key)
+        if data is None:
+            data = render_placeholder(title, subtitle)
+            self.store_on_disk(key, data)
+        self.entries[key] = data
+        return data
+    
+    def load_from_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, f"{key}.jpg")
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Mark as recently used for eviction
+            return data
+        except OSError:
+            return None
+    
+    def store_on_disk(self, key, data):
+        if not self.cache_dir:
+            return
+        try:
+            target = os.path.join(self.cache_dir, f"{key}.jpg")
+            temp_path = f"{target}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, target)
+            self.evict()
+        except OSError as e:
+            logging.error(f"Error writing placeholder cache: {str(e)}")
+    
+    def evict(self):
+        """Delete least recently used entries until the folder fits in max_bytes"""
+        evict_cache_files(self.cache_dir, self.max_bytes, '.jpg')
+
+FRONT_PHOTO_KEYWORDS = ('front', 'exterior', 'house')
+
+def natural_sort_key(name):
+    """Sort key that orders Picture2 before Picture10"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
+def is_image_file(name):
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+class PhotoIndex:
+    """Snapshot of the images folder, scanned once per batch with os.scandir
+    
+    Holds the room folders with their sorted image lists, the header/footer and
+    front photo matches and the mtime of every folder and image. refresh() only
+    rescans the folders whose mtime changed since the last scan.
+    """
+    def __init__(self, images_folder_path):
+        self.images_folder_path = images_folder_path
+        self.root_mtime = None
+        self.root_images = []
+        self.rooms = {}
+        self.room_mtimes = {}
+        self.image_mtimes = {}
+        self.header_image_path = None
+        self.footer_image_path = None
+        self.front_photo_path = None
+        self.keyword_matches = {}
+        # Photos that failed validation, left out of every lookup below
+        self.bad_images = {}
+        self.refresh()
+    
+    def refresh(self, check_images=False):
+        """Rescan changed folders; returns True if anything in the index changed
+        
+        A photo saved over an existing one doesn't change its folder's mtime; with
+        check_images set every indexed image is stat'ed too, to pick those up.
+        """
+        if not self.images_folder_path or not os.path.isdir(self.images_folder_path):
+            changed = bool(self.rooms or self.root_images)
+            self.root_mtime = None
+            self.root_images = []
+            self.rooms = {}
+            self.room_mtimes = {}
+            self.image_mtimes = {}
+            self.index_root_matches()
+            return changed
+        
+        changed = False
+        root_mtime = os.stat(self.images_folder_path).st_mtime_ns
+        if root_mtime != self.root_mtime:
+            self.scan_root()
+            self.root_mtime = root_mtime
+            changed = True
+        
+        for room in list(self.rooms):
+            room_path = os.path.join(self.images_folder_path, room)
+            try:
+                room_mtime = os.stat(room_path).st_mtime_ns
+            except OSError:
+                continue
+            if room_mtime != self.room_mtimes.get(room):
+                self.scan_room(room, room_mtime)
+                changed = True
+        if check_images and self.refresh_image_mtimes():
+            changed = True
+        return changed
+    
+    def refresh_image_mtimes(self):
+        """Restat every indexed image; returns True if any was overwritten since it was scanned"""
+        changed = False
+        for path, mtime in list(self.image_mtimes.items()):
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                continue  # Removed: its folder's mtime moved, so the next refresh rescans it
+            if current != mtime:
+                self.image_mtimes[path] = current
+                changed = True
+        return changed
+    
+    def scan_root(self):
+        for file in self.root_images:
+            self.image_mtimes.pop(os.path.join(self.images_folder_path, file), None)
+        root_images = []
+        rooms = []
+        with os.scandir(self.images_folder_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    rooms.append(entry.name)
+                elif entry.is_file() and is_image_file(entry.name):
+                    root_images.append(entry.name)
+                    self.image_mtimes[entry.path] = entry.stat().st_mtime_ns
+        
+        self.root_images = sorted(root_images, key=natural_sort_key)
+        # Keep already scanned rooms; refresh() rescans them if their mtime moved
+        for removed_room in set(self.rooms) - set(rooms):
+            for photo_path in self.rooms[removed_room] or []:
+                self.image_mtimes.pop(photo_path, None)
+        self.rooms = {room: self.rooms.get(room) for room in sorted(rooms, key=natural_sort_key)}
+        self.room_mtimes = {room: mtime for room, mtime in self.room_mtimes.items() if room in self.rooms}
+        for room in self.rooms:
+            if self.rooms[room] is None:
+                room_path = os.path.join(self.images_folder_path, room)
+                self.scan_room(room, os.stat(room_path).st_mtime_ns)
+        self.index_root_matches()
+    
+    def scan_room(self, room, room_mtime):
+        room_path = os.path.join(self.images_folder_path, room)
+        for photo_path in self.rooms.get(room) or []:
+            self.image_mtimes.pop(photo_path, None)
+        photos = []
+        with os.scandir(room_path) as entries:
+            for entry in entries:
+                if entry.is_file() and is_image_file(entry.name):
+                    photos.append(entry.path)
+                    self.image_mtimes[entry.path] = entry.stat().st_mtime_ns
+        self.rooms[room] = sorted(photos, key=lambda path: natural_sort_key(os.path.basename(path)))
+        self.room_mtimes[room] = room_mtime
+    
+    def index_root_matches(self):
+        """Work out header, footer and front photo matches once per scan"""
+        self.header_image_path = None
+        self.footer_image_path = None
+        self.keyword_matches = {}
+        for file in self.root_images:
+            if os.path.join(self.images_folder_path, file) in self.bad_images:
+                continue
+            lower_name = file.lower()
+            if 'header' in lower_name:
+                self.header_image_path = os.path.join(self.images_folder_path, file)
+            elif 'footer' in lower_name:
+                self.footer_image_path = os.path.join(self.images_folder_path, file)
+        self.front_photo_path = self.find_photo(*FRONT_PHOTO_KEYWORDS)
+    
+    def find_photo(self, *keywords):
+        """Find a root photo containing any of the keywords in its name"""
+        if keywords not in self.keyword_matches:
+            match = None
+            for file in self.root_images:
+                path = os.path.join(self.images_folder_path, file)
+                if path not in self.bad_images and any(keyword.lower() in file.lower() for keyword in keywords):
+                    match = path
+                    break
+            self.keyword_matches[keywords] = match
+        return self.keyword_matches[keywords]
+    
+    def room_names(self):
+        return list(self.rooms)
+    
+    def room_photos(self, room):
+        photos = self.rooms.get(room) or []
+        if self.bad_images:
+            photos = [path for path in photos if path not in self.bad_images]
+        return photos
+    
+    def image_paths(self):
+        """Every indexed image: root images and all room photos"""
+        paths = [os.path.join(self.images_folder_path, file) for file in self.root_images]
+        for photos in self.rooms.values():
+            paths.extend(photos or [])
+        return paths
+    
+    def set_bad_images(self, bad_images):
+        """Leave these photos out of the header/footer/front matches and room photo lists"""
+        self.bad_images = dict(bad_images)
+        self.index_root_matches()
+    
+    def for_claim(self, claim_number):
+        """Photos for the given claim - every claim shares this folder"""
+        return self
+    
+    def all_indexes(self):
+        """Every folder index whose photos can end up in a report"""
+        return [self]
+
+# Stands in for a claim with no photo folder: placeholders only
+EMPTY_PHOTO_INDEX = PhotoIndex(None)
+
+def claim_key(value):
+    """Normalized claim number for folder matching: case, separators and leading zeros are ignored"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Numeric claim numbers read from Excel come back as floats
+    key = re.sub(r'[^A-Z0-9]', '', str(value).upper())
+    return re.sub(r'\d+', lambda match: str(int(match.group())), key)
+
+def folder_claim_keys(folder_name):
+    """Keys a claim folder answers to: its whole name, each word, and each pair of adjacent words
+    
+    This lets "PR1923", "pr-01923" and "PR 1923 - Abigail Carter" all match claim PR1923.
+    """
+    words = [word for word in re.split(r'[^A-Za-z0-9]+', folder_name) if word]
+    keys = {claim_key(word) for word in words}
+    keys.update(claim_key(first + second) for first, second in zip(words, words[1:]))
+    keys.discard(claim_key(folder_name))
+    keys.discard('')
+    return keys
+
+class ClaimPhotoIndex(PhotoIndex):
+    """Root folder holding one photo folder per claim, each indexed like a single-claim images folder
+    
+    Header and footer images are shared and taken from the root. Claim folders are
+    matched to the CLAIM # column through claim_key(): a folder named exactly after
+    the claim wins, otherwise a folder containing the claim number as a word.
+    """
+    def __init__(self, images_folder_path):
+        self.claim_folders = {}
+        self.exact_keys = {}
+        self.word_keys = {}
+        super().__init__(images_folder_path)
+    
+    def refresh(self, check_images=False):
+        changed = super().refresh(check_images)
+        if self.root_mtime is None and self.claim_folders:
+            self.claim_folders, self.exact_keys, self.word_keys = {}, {}, {}
+            changed = True
+        for folder_index in self.claim_folders.values():
+            if folder_index.refresh(check_images):
+                changed = True
+        return changed
+    
+    def scan_root(self):
+        for file in self.root_images:
+            self.image_mtimes.pop(os.path.join(self.images_folder_path, file), None)
+        root_images = []
+        folders = []
+        with os.scandir(self.images_folder_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    folders.append(entry.name)
+                elif entry.is_file() and is_image_file(entry.name):
+                    root_images.append(entry.name)
+                    self.image_mtimes[entry.path] = entry.stat().st_mtime_ns
+        self.root_images = sorted(root_images, key=natural_sort_key)
+        
+        # Keep the indexes of folders that are still there; refresh() rescans them if they changed
+        self.claim_folders = {
+            folder: self.claim_folders.get(folder) or PhotoIndex(os.path.join(self.images_folder_path, folder))
+            for folder in sorted(folders, key=natural_sort_key)
+        }
+        self.exact_keys = {}
+        word_matches = {}
+        for folder in self.claim_folders:
+            self.exact_keys.setdefault(claim_key(folder), folder)
+            for key in folder_claim_keys(folder):
+                word_matches.setdefault(key, []).append(folder)
+        # A word shared by several folders (a surname, a city) can't identify a claim
+        self.word_keys = {key: matches[0] for key, matches in word_matches.items() if len(matches) == 1}
+        self.index_root_matches()
+    
+    def claim_folder(self, claim_number):
+        """Name of the folder holding this claim's photos, or None"""
+        key = claim_key(claim_number)
+        if not key:
+            return None
+        return self.exact_keys.get(key) or self.word_keys.get(key)
+    
+    def for_claim(self, claim_number):
+        folder = self.claim_folder(claim_number)
+        return self.claim_folders[folder] if folder is not None else EMPTY_PHOTO_INDEX
+    
+    def all_indexes(self):
+        return list(self.claim_folders.values())
+    
+    def image_paths(self):
+        paths = super().image_paths()
+        for folder_index in self.claim_folders.values():
+            paths.extend(folder_index.image_paths())
+        return paths
+    
+    def set_bad_images(self, bad_images):
+        super().set_bad_images(bad_images)
+        for folder_index in self.claim_folders.values():
+            folder_index.set_bad_images(bad_images)
+
+class ReportTemplate:
+    """Report skeleton compiled once per batch and cloned for every claim
+    
+    The compiled package holds the Normal style, the header and footer parts with
+    their images and the title. Static sections are built once as XML fragments
+    and copied into each clone, so per claim only the changing fields are added.
+    """
+    def __init__(self, header_image=None, footer_image=None, fragment_builders=None):
+        doc = Document()
+        self.fragments = {}
+        
+        # Add header image if found
+        if header_image:
+            try:
+                header = doc.sections[0].header
+                header.is_linked_to_previous = False
+                paragraph = header.paragraphs[0] if header.paragraphs else header.add_paragraph()
+                paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+                run = paragraph.add_run()
+                run.add_picture(header_image, width=Inches(6))
+                # Add space after header
+                doc.add_paragraph("\n\n")
+            except Exception as e:
+                logging.error(f"Error adding header image: {str(e)}")
+        
+        # Set default font
+        style = doc.styles['Normal']
+        font = style.font
+        font.name = 'Arial'
+        font.size = Pt(10)
+        
+        # Add title
+        title = doc.add_heading('FIRST INSPECTION REPORT', level=1)
+        title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        
+        # Add footer image if found; the space before it is a fragment added after the rooms
+        if footer_image:
+            try:
+                footer = doc.sections[0].footer
+                footer.is_linked_to_previous = False
+                paragraph = footer.paragraphs[0] if footer.paragraphs else footer.add_paragraph()
+                paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+                run = paragraph.add_run()
+                run.add_picture(footer_image, width=Inches(6))
+                self.compile_fragment(doc, 'footer_spacer', lambda doc: doc.add_paragraph("\n\n"))
+            except Exception as e:
+                logging.error(f"Error adding footer image: {str(e)}")
+        
+        for name, builder in (fragment_builders or {}).items():
+            self.compile_fragment(doc, name, builder)
+        
+        self.style_ids = {style.name: style.style_id for style in doc.styles}
+        section = doc.sections[-1]
+        self.block_width = section.page_width - section.left_margin - section.right_margin
+        
+        stream = io.BytesIO()
+        doc.save(stream)
+        self.blob = stream.getvalue()
+        self.compile_package()
+    
+    def compile_package(self):
+        """Split the saved template into the pieces the direct OOXML backend fills in"""
+        with zipfile.ZipFile(io.BytesIO(self.blob)) as package:
+            self.parts = [(info.filename, package.read(info.filename)) for info in package.infolist()]
+        parts = dict(self.parts)
+        
+        document_xml = parts['word/document.xml'].decode('utf-8')
+        split_at = document_xml.rfind('<w:sectPr')
+        self.document_xml_head = document_xml[:split_at]
+        self.document_xml_tail = document_xml[split_at:]
+        
+        self.document_rels_xml = parts['word/_rels/document.xml.rels'].decode('utf-8')
+        rel_numbers = [int(number) for number in re.findall(r'Id="rId(\d+)"', self.document_rels_xml)]
+        self.first_rel_number = max(rel_numbers, default=0) + 1
+        
+        media_numbers = [int(number) for number in re.findall(r'^word/media/image(\d+)\.', '\n'.join(parts), re.M)]
+        self.first_media_number = max(media_numbers, default=0) + 1
+        
+        # Defaults are kept sorted by extension, as python-docx writes them
+        content_types_xml = parts['[Content_Types].xml'].decode('utf-8')
+        defaults = re.findall(r'<Default Extension="([^"]+)" ContentType="([^"]+)"/>', content_types_xml)
+        self.content_type_defaults = dict(defaults)
+        defaults_start = content_types_xml.index('<Default ')
+        defaults_end = content_types_xml.rindex('<Default ')
+        defaults_end = content_types_xml.index('/>', defaults_end) + 2
+        self.content_types_head = content_types_xml[:defaults_start]
+        self.content_types_tail = content_types_xml[defaults_end:]
+        
+        self.fragment_xml = {
+            name: ''.join(etree.tostring(element, encoding='unicode') for element in elements)
+            for name, elements in self.fragments.items()
+        }
+    
+    def compile_fragment(self, doc, name, builder):
+        """Run a section builder on the template and keep what it added as a reusable fragment"""
+        body = doc.element.body
+        existing = set(body)
+        builder(doc)
+        elements = [child for child in body if child not in existing]
+        for element in elements:
+            body.remove(element)
+        self.fragments[name] = elements
+    
+    def new_document(self, backend='docx'):
+        """Clone the template; header/footer media come along as already embedded parts"""
+        if backend == 'ooxml':
+            return OoxmlDocument(self)
+        return Document(io.BytesIO(self.blob))
+    
+    def append_fragment(self, doc, name):
+        if isinstance(doc, OoxmlDocument):
+            if name in self.fragment_xml:
+                doc.append_xml(self.fragment_xml[name])
+            return
+        body = doc.element.body
+        sect_pr = body.sectPr
+        for element in self.fragments.get(name, []):
+            clone = copy.deepcopy(element)
+            if sect_pr is not None:
+                sect_pr.addprevious(clone)
+            else:
+                body.append(clone)
+
+# How report packages are zipped. store_media writes JPEG/PNG/GIF parts without deflating them again
+# (they are already compressed); deflate_level is the zlib level for the XML parts, None for zlib's default
+PackagingOptions = namedtuple('PackagingOptions', ['store_media', 'deflate_level'], defaults=(False, None))
+DEFAULT_PACKAGING = PackagingOptions()
+COMPRESSED_MEDIA_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif')
+# Compared by ReportEngine.compare_packaging
+PACKAGING_CHOICES = [
+    PackagingOptions(False, None),
+    PackagingOptions(False, 1),
+    PackagingOptions(False, 9),
+    PackagingOptions(True, None),
+    PackagingOptions(True, 1),
+    PackagingOptions(True, 9),
+]
+
+def describe_packaging(packaging):
+    media = "store media" if packaging.store_media else "deflate media"
+    level = "default level" if packaging.deflate_level is None else f"level {packaging.deflate_level}"
+    return f"{media}, {level}"
+
+class PackageZipWriter:
+    """Zip writer for report packages that applies PackagingOptions part by part
+    
+    Also implements python-docx's physical package writer interface (write(pack_uri, blob)
+    and close()), so python-docx documents can be packaged through it.
+    """
+    def __init__(self, file, packaging):
+        self.packaging = packaging
+        self.zipf = zipfile.ZipFile(file, 'w', zipfile.ZIP_DEFLATED, compresslevel=packaging.deflate_level)
+    
+    def writestr(self, name, data):
+        if self.packaging.store_media and name.lower().endswith(COMPRESSED_MEDIA_EXTENSIONS):
+            self.zipf.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+        else:
+            self.zipf.writestr(name, data)
+    
+    def write(self, pack_uri, blob):
+        self.writestr(pack_uri.membername, blob)
+    
+    def close(self):
+        self.zipf.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+@LazyImport
+def PackageWriter():
+    from docx.opc.pkgwriter import PackageWriter
+    return PackageWriter
+
+# Private python-docx API used by save_docx_package; python-docx isn't pinned, so it is checked first
+PACKAGE_WRITER_METHODS = ('_write_content_types_stream', '_write_pkg_rels', '_write_parts')
+
+def save_docx_package(doc, stream, packaging):
+    """Document.save() with our own zip writer: same parts in the same order, packaged per the options"""
+    package = doc.part.package
+    parts = list(package.iter_parts())
+    if not (all(hasattr(PackageWriter, name) for name in PACKAGE_WRITER_METHODS)
+            and all(hasattr(part, 'before_marshal') for part in parts)):
+        # A python-docx release without these internals: save normally, then repackage
+        saved = io.BytesIO()
+        doc.save(saved)
+        repackage_docx(saved, stream, packaging)
+        return
+    for part in parts:
+        part.before_marshal()
+    with PackageZipWriter(stream, packaging) as writer:
+        PackageWriter._write_content_types_stream(writer, parts)
+        PackageWriter._write_pkg_rels(writer, package.rels)
+        PackageWriter._write_parts(writer, parts)
+
+def repackage_docx(source, stream, packaging):
+    """Copy a saved .docx entry by entry, in order, through a PackageZipWriter"""
+    with zipfile.ZipFile(source) as package, PackageZipWriter(stream, packaging) as writer:
+        for info in package.infolist():
+            writer.writestr(info.filename, package.read(info))
+
+# Direct OOXML backend: precompiled WordprocessingML fragments filled in with escaped text
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# Keyed by WD_PARAGRAPH_ALIGNMENT member name, so python-docx isn't needed to build the table
+ALIGNMENT_VALUES = {
+    'LEFT': 'left',
+    'CENTER': 'center',
+    'RIGHT': 'right',
+    'JUSTIFY': 'both',
+}
+IMAGE_CONTENT_TYPES = {'jpg': 'image/jpeg', 'png': 'image/png', 'gif': 'image/gif', 'bmp': 'image/bmp', 'tiff': 'image/tiff'}
+IMAGE_RELATIONSHIP = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+
+P_XML = '<w:p>{props}{runs}</w:p>'
+P_PROPS_XML = '<w:pPr>{style}{alignment}</w:pPr>'
+P_STYLE_XML = '<w:pStyle w:val="{style_id}"/>'
+P_ALIGNMENT_XML = '<w:jc w:val="{value}"/>'
+RUN_XML = '<w:r>{content}</w:r>'
+TEXT_XML = '<w:t>{text}</w:t>'
+TEXT_PRESERVE_XML = '<w:t xml:space="preserve">{text}</w:t>'
+PICTURE_XML = (
+    '<w:drawing><wp:inline xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+    '<wp:extent cx="{cx}" cy="{cy}"/><wp:docPr id="{shape_id}" name="Picture {shape_id}"/>'
+    '<wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+    '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+    '<pic:pic><pic:nvPicPr><pic:cNvPr id="0" name="{filename}"/><pic:cNvPicPr/></pic:nvPicPr>'
+    '<pic:blipFill><a:blip r:embed="{rel_id}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+    '<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"/></pic:spPr></pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing>'
+)
+TABLE_XML = (
+    '<w:tbl><w:tblPr><w:tblW w:type="auto" w:w="0"/>{layout}'
+    '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+    'w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr><w:tblGrid>{grid}</w:tblGrid>{rows}</w:tbl>'
+)
+TABLE_FIXED_LAYOUT_XML = '<w:tblLayout w:type="fixed"/>'
+GRID_COL_XML = '<w:gridCol w:w="{width}"/>'
+ROW_XML = '<w:tr>{cells}</w:tr>'
+CELL_XML = '<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr>{paragraphs}</w:tc>'
+RELATIONSHIP_XML = '<Relationship Id="{rel_id}" Type="{rel_type}" Target="{target}"/>'
+CONTENT_TYPE_DEFAULT_XML = '<Default Extension="{extension}" ContentType="{content_type}"/>'
+
+def escape_xml_text(text):
+    text = str(text)
+    if INVALID_XML_CHARS.search(text):
+        raise ValueError("All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters")
+    return escape(text)
+
+def run_content_xml(text):
+    """Run content the way python-docx writes it: tabs and line breaks become elements"""
+    parts = []
+    for piece in re.split(r'(\t|\r\n|\n|\r)', text):
+        if piece == '\t':
+            parts.append('<w:tab/>')
+        elif piece in ('\n', '\r', '\r\n'):
+            parts.append('<w:br/>' * len(piece))
+        elif piece:
+            template = TEXT_PRESERVE_XML if piece != piece.strip() else TEXT_XML
+            parts.append(template.format(text=escape_xml_text(piece)))
+    return ''.join(parts)
+
+def detect_image_extension(blob):
+    if blob.startswith(b'\xff\xd8'):
+        return 'jpg'
+    if blob.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if blob[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if blob.startswith(b'BM'):
+        return 'bmp'
+    if blob[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'tiff'
+    raise ValueError("Unrecognized image format")
+
+class OoxmlRun:
+    def __init__(self, document, text=''):
+        self.document = document
+        self.content = run_content_xml(str(text)) if text else ''
+    
+    def add_picture(self, image, width=None, height=None):
+        self.content += self.document.picture_xml(image, width, height)
+    
+    def to_xml(self):
+        return RUN_XML.format(content=self.content)
+
+class OoxmlParagraph:
+    def __init__(self, document, text='', style=None):
+        self.document = document
+        self.style_id = document.style_id(style) if style else None
+        self.alignment = None
+        self.runs = []
+        if text:
+            self.add_run(text)
+    
+    def add_run(self, text=''):
+        run = OoxmlRun(self.document, text)
+        self.runs.append(run)
+        return run
+    
+    @property
+    def text(self):
+        return ''.join(re.sub(r'<[^>]+>', '', run.content) for run in self.runs)
+    
+    def to_xml(self):
+        style = P_STYLE_XML.format(style_id=self.style_id) if self.style_id else ''
+        alignment = P_ALIGNMENT_XML.format(value=ALIGNMENT_VALUES[self.alignment.name]) if self.alignment is not None else ''
+        props = P_PROPS_XML.format(style=style, alignment=alignment) if style or alignment else ''
+        runs = ''.join(run.to_xml() for run in self.runs)
+        if not props and not runs:
+            return '<w:p/>'
+        return P_XML.format(props=props, runs=runs)
+
+class OoxmlCell:
+    def __init__(self, document, column):
+        self.document = document
+        self.column = column
+        self.paragraphs = [OoxmlParagraph(document)]
+    
+    def add_paragraph(self, text='', style=None):
+        paragraph = OoxmlParagraph(self.document, text, style)
+        self.paragraphs.append(paragraph)
+        return paragraph
+    
+    @property
+    def text(self):
+        return '\n'.join(paragraph.text for paragraph in self.paragraphs)
+    
+    @text.setter
+    def text(self, value):
+        self.paragraphs = [OoxmlParagraph(self.document, value)]
+    
+    def to_xml(self):
+        paragraphs = ''.join(paragraph.to_xml() for paragraph in self.paragraphs)
+        return CELL_XML.format(width=self.column.width.twips, paragraphs=paragraphs)
+
+class OoxmlColumn:
+    def __init__(self, width):
+        self.width = width
+
+class OoxmlRow:
+    def __init__(self, document, columns):
+        self.cells = [OoxmlCell(document, column) for column in columns]
+    
+    def to_xml(self):
+        return ROW_XML.format(cells=''.join(cell.to_xml() for cell in self.cells))
+
+class OoxmlTable:
+    def __init__(self, document, rows, cols):
+        self.document = document
+        self.autofit = True
+        self.columns = [OoxmlColumn(Emu(document.template.block_width // cols)) for _ in range(cols)]
+        self.rows = []
+        for _ in range(rows):
+            self.add_row()
+    
+    def add_row(self):
+        row = OoxmlRow(self.document, self.columns)
+        self.rows.append(row)
+        return row
+    
+    def to_xml(self):
+        grid = ''.join(GRID_COL_XML.format(width=column.width.twips) for column in self.columns)
+        return TABLE_XML.format(
+            layout='' if self.autofit else TABLE_FIXED_LAYOUT_XML,
+            grid=grid,
+            rows=''.join(row.to_xml() for row in self.rows)
+        )
+
+class OoxmlDocument:
+    """Report document written straight to a .docx zip, bypassing python-docx's object model
+    
+    Implements the subset of the python-docx Document API that the section builders
+    use (paragraphs, runs, pictures and tables), so both backends produce the same
+    layout from the same code. Blocks are rendered from the precompiled fragments
+    above and combined with the compiled template's parts on save.
+    """
+    def __init__(self, template):
+        self.template = template
+        self.blocks = []
+        self.media = []
+        self.media_by_hash = {}
+        self.next_shape_id = 1
+    
+    @property
+    def paragraphs(self):
+        return [block for block in self.blocks if isinstance(block, OoxmlParagraph)]
+    
+    def style_id(self, style_name):
+        return self.template.style_ids[style_name]
+    
+    def add_paragraph(self, text='', style=None):
+        paragraph = OoxmlParagraph(self, text, style)
+        self.blocks.append(paragraph)
+        return paragraph
+    
+    def add_picture(self, image, width=None, height=None):
+        paragraph = self.add_paragraph()
+        paragraph.add_run().add_picture(image, width, height)
+        return paragraph
+    
+    def add_table(self, rows, cols):
+        table = OoxmlTable(self, rows, cols)
+        self.blocks.append(table)
+        return table
+    
+    def append_xml(self, xml):
+        self.blocks.append(xml)
+    
+    def picture_xml(self, image, width, height):
+        """Embed an image part (once per distinct image) and return its inline drawing"""
+        if isinstance(image, str):
+            filename = os.path.basename(image)
+            with open(image, 'rb') as f:
+                blob = f.read()
+        else:
+            blob = image.read()
+            filename = None
+        extension = detect_image_extension(blob)
+        filename = filename or f"image.{extension}"
+        
+        if width is None or height is None:
+            with Image.open(io.BytesIO(blob)) as img:
+                pixel_width, pixel_height = img.size
+            if width is None and height is None:
+                width, height = Emu(pixel_width * 9525), Emu(pixel_height * 9525)
+            elif width is None:
+                width = Emu(round(height * pixel_width / pixel_height))
+            else:
+                height = Emu(round(width * pixel_height / pixel_width))
+        
+        digest = hashlib.sha1(blob).hexdigest()
+        rel_id = self.media_by_hash.get(digest)
+        if rel_id is None:
+            number = self.template.first_media_number + len(self.media)
+            rel_id = f"rId{self.template.first_rel_number + len(self.media)}"
+            self.media.append((rel_id, f"word/media/image{number}.{extension}", extension, blob))
+            self.media_by_hash[digest] = rel_id
+        
+        shape_id = self.next_shape_id
+        self.next_shape_id += 1
+        return PICTURE_XML.format(cx=int(width), cy=int(height), shape_id=shape_id,
+                                  filename=escape_xml_text(filename), rel_id=rel_id)
+    
+    def to_xml(self):
+        body = ''.join(block if isinstance(block, str) else block.to_xml() for block in self.blocks)
+        return self.template.document_xml_head + body + self.template.document_xml_tail
+    
+    def save(self, path_or_stream, packaging=DEFAULT_PACKAGING):
+        template = self.template
+        relationships = ''.join(
+            RELATIONSHIP_XML.format(rel_id=rel_id, rel_type=IMAGE_RELATIONSHIP, target=name[len('word/'):])
+            for rel_id, name, _, _ in self.media
+        )
+        defaults = dict(template.content_type_defaults)
+        for _, _, extension, _ in self.media:
+            defaults.setdefault(extension, IMAGE_CONTENT_TYPES[extension])
+        content_types = template.content_types_head + ''.join(
+            CONTENT_TYPE_DEFAULT_XML.format(extension=extension, content_type=defaults[extension])
+            for extension in sorted(defaults)
+        ) + template.content_types_tail
+        
+        with PackageZipWriter(path_or_stream, packaging) as package:
+            for name, data in template.parts:
+                if name == '[Content_Types].xml':
+                    data = content_types.encode('utf-8')
+                elif name == 'word/document.xml':
+                    data = self.to_xml().encode('utf-8')
+                elif name == 'word/_rels/document.xml.rels':
+                    data = template.document_rels_xml.replace('</Relationships>', relationships + '</Relationships>').encode('utf-8')
+                package.writestr(name, data)
+            for _, name, _, blob in self.media:
+                package.writestr(name, blob)
+
+# Result of checking one photo; error is None for a usable image
+PhotoCheck = namedtuple('PhotoCheck', ['path', 'error', 'width', 'height', 'orientation'])
+PHOTO_CHECKS_NAME = 'photo_checks.json'
+BAD_PHOTOS_REPORT_NAME = 'bad_photos.csv'
+
+class PhotoValidationError(Exception):
+    """Raised before any report is built when photos fail validation in strict mode"""
+    def __init__(self, bad_photos, report_path=None):
+        self.bad_photos = bad_photos
+        self.report_path = report_path
+        details = f" - see {report_path}" if report_path else ""
+        super().__init__(f"{len(bad_photos)} photo(s) failed validation{details}")
+
+def check_photo(path):
+    """Header, dimensions and EXIF orientation of one photo, plus a reduced-size decode to catch truncated files"""
+    try:
+        with open(path, 'rb') as f:
+            detect_image_extension(f.read(16))
+        with Image.open(path) as img:
+            width, height = img.size
+            orientation = img.getexif().get(0x0112, 1)
+            # JPEGs decode at 1/8 scale here, which still reads every block of the file
+            img.draft('RGB', (max(1, width // 8), max(1, height // 8)))
+            img.load()
+        return PhotoCheck(path, None, width, height, orientation)
+    except Exception as e:
+        return PhotoCheck(path, f"{type(e).__name__}: {e}", None, None, None)
+
+class PhotoValidator:
+    """Checks every indexed photo once on a thread pool, remembering results between runs
+    
+    Results are keyed by path, mtime and size and kept in cache_dir, so a photo is
+    only opened again after it changes.
+    """
+    def __init__(self, cache_dir=None, max_threads=None):
+        self.path = os.path.join(cache_dir, PHOTO_CHECKS_NAME) if cache_dir else None
+        self.max_threads = max_threads
+        self.checks = {}
+        self.load()
+    
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.checks = json.load(f)
+        except (OSError, ValueError):
+            self.checks = {}
+    
+    def save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.checks, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.error(f"Error saving photo checks {self.path}: {str(e)}")
+    
+    def prune(self, current_paths):
+        """Forget photos that have since been deleted, so the saved checks don't grow with every batch"""
+        for path in list(self.checks):
+            if path not in current_paths and not os.path.exists(path):
+                del self.checks[path]
+    
+    def validate(self, paths):
+        """Return {path: PhotoCheck} for every photo in paths that can't be used"""
+        results = {}
+        pending = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                results[path] = PhotoCheck(path, f"{type(e).__name__}: {e}", None, None, None)
+                continue
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            cached = self.checks.get(path)
+            if cached and cached[:2] == stamp:
+                results[path] = PhotoCheck(path, *cached[2:])
+            else:
+                pending.append((path, stamp))
+        
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
+                for (path, stamp), check in zip(pending, executor.map(check_photo, [path for path, _ in pending])):
+                    results[path] = check
+                    self.checks[path] = stamp + list(check[1:])
+            self.prune(results)
+            self.save()
+        logging.info(f"Validated {len(results)} photos ({len(pending)} checked, {len(results) - len(pending)} cached)")
+        return {path: check for path, check in results.items() if check.error}
+
+def write_bad_photos_report(folder, bad_photos):
+    """List the photos that failed validation next to the reports; returns the report path"""
+    path = os.path.join(folder, BAD_PHOTOS_REPORT_NAME)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['path', 'error', 'width', 'height', 'orientation'])
+        for check in sorted(bad_photos.values()):
+            writer.writerow(check)
+    return path
+
+# Report sections in build order, as timed for each claim
+CLAIM_STAGES = ['template', 'insured_info', 'front_photo', 'cause_of_loss', 'scope_of_work',
+                'reserves', 'conclusion', 'room_photos', 'footer', 'serialize', 'write']
+# Batch-wide stages that aren't tied to a single claim
+BATCH_STAGES = ['scan', 'read', 'validate_photos', 'prepare_images']
+
+class ClaimMetrics:
+    """Stage durations and counters for one claim's report, sent back from worker processes"""
+    def __init__(self):
+        self.stages = {}
+        self.images = 0
+        self.placeholders = 0
+        self.bytes_written = 0
+    
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+    
+    @property
+    def total(self):
+        return sum(self.stages.values())
+
+class BatchMetrics:
+    """Per-claim metrics for a batch plus the batch-wide stages, with JSON/CSV export"""
+    def __init__(self):
+        self.stages = dict.fromkeys(BATCH_STAGES, 0.0)
+        self.claims = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+    
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+    
+    def timed_claims(self, claims):
+        """Pass claims through, counting the time spent parsing the input as the read stage"""
+        iterator = iter(claims)
+        while True:
+            with self.stage('read'):
+                claim = next(iterator, None)
+            if claim is None:
+                return
+            yield claim
+    
+    def add(self, result):
+        self.claims.append(result)
+        metrics = result.metrics
+        if metrics is not None and logging.getLogger().isEnabledFor(logging.DEBUG):
+            for name, seconds in metrics.stages.items():
+                logging.debug(f"Claim {result.claim}: {name} took {seconds:.3f}s",
+                              extra={'claim': result.claim, 'stage': name, 'duration': seconds})
+        logging.info(f"Claim {result.claim}: {result.status}",
+                     extra={'claim': result.claim, 'stage': 'claim', 'status': result.status,
+                            'duration': metrics.total if metrics is not None else None})
+    
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        for name, seconds in self.stages.items():
+            logging.info(f"Batch {name} took {seconds:.3f}s", extra={'stage': name, 'duration': seconds})
+        logging.info(f"Batch of {len(self.claims)} claims took {self.elapsed:.3f}s",
+                     extra={'stage': 'batch', 'duration': self.elapsed})
+    
+    def built_claims(self):
+        return [result for result in self.claims if result.metrics is not None]
+    
+    def stage_totals(self):
+        totals = dict.fromkeys(CLAIM_STAGES, 0.0)
+        for result in self.built_claims():
+            for name, seconds in result.metrics.stages.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+    
+    def claim_rows(self):
+        rows = []
+        for result in sorted(self.claims, key=lambda result: result.index):
+            metrics = result.metrics or ClaimMetrics()
+            row = {
+                'index': result.index,
+                'claim': result.claim,
+                'status': result.status,
+                'file': os.path.basename(result.path) if result.path else '',
+                'total': round(metrics.total, 6),
+                'images': metrics.images,
+                'placeholders': metrics.placeholders,
+                'bytes_written': metrics.bytes_written,
+            }
+            for name in CLAIM_STAGES:
+                row[name] = round(metrics.stages.get(name, 0.0), 6)
+            rows.append(row)
+        return rows
+    
+    def to_dict(self):
+        built = self.built_claims()
+        return {
+            'elapsed': round(self.elapsed, 6),
+            'claims': len(self.claims),
+            'statuses': {status: sum(1 for result in self.claims if result.status == status)
+                         for status in ('success', 'skipped', 'failed')},
+            'batch_stages': {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            'claim_stages': {name: round(seconds, 6) for name, seconds in self.stage_totals().items()},
+            'images': sum(result.metrics.images for result in built),
+            'placeholders': sum(result.metrics.placeholders for result in built),
+            'bytes_written': sum(result.metrics.bytes_written for result in built),
+            'per_claim': self.claim_rows(),
+        }
+    
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+    
+    def write_csv(self, path):
+        fieldnames = ['index', 'claim', 'status', 'file', 'total', *CLAIM_STAGES, 'images', 'placeholders', 'bytes_written']
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(self.claim_rows())
+    
+    def export(self, path):
+        """Write per-claim metrics as CSV for a .csv path, otherwise as JSON"""
+        if path.lower().endswith('.csv'):
+            self.write_csv(path)
+        else:
+            self.write_json(path)
+    
+    def summary_lines(self):
+        built = self.built_claims()
+        lines = [f"Batch took {self.elapsed:.2f}s for {len(self.claims)} claims ({len(built)} built)"]
+        for name, seconds in self.stages.items():
+            lines.append(f"  {name:<15}{seconds:>9.3f}s")
+        if built:
+            totals = self.stage_totals()
+            claim_time = sum(totals.values())
+            for name, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+                share = seconds / claim_time * 100 if claim_time else 0
+                lines.append(f"  {name:<15}{seconds:>9.3f}s  {seconds / len(built) * 1000:>8.1f}ms/claim  {share:>5.1f}%")
+            images = sum(result.metrics.images for result in built)
+            placeholders = sum(result.metrics.placeholders for result in built)
+            written = sum(result.metrics.bytes_written for result in built)
+            lines.append(f"  {images} images, {placeholders} placeholders, {written / 1e6:.1f} MB written")
+            slowest = max(built, key=lambda result: result.metrics.total)
+            lines.append(f"  Slowest claim: {slowest.claim} ({slowest.metrics.total:.3f}s)")
+        return lines
+
+# A report that has been built but not yet written; document is the Document, or its bytes once serialized
+PendingReport = namedtuple('PendingReport', ['index', 'claim', 'filename', 'document', 'metrics'])
+
+# Reports allowed to wait between two pipeline stages
+PIPELINE_DEPTH = 2
+
+def atomic_write(path, data):
+    """Write data to a temp file next to path, then rename it, so a partial report is never left behind"""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def serialize_report(doc, metrics, packaging=DEFAULT_PACKAGING):
+    """Package a built document into .docx bytes"""
+    with metrics.stage('serialize'):
+        stream = io.BytesIO()
+        if isinstance(doc, OoxmlDocument):
+            doc.save(stream, packaging)
+        elif packaging == DEFAULT_PACKAGING:
+            doc.save(stream)
+        else:
+            save_docx_package(doc, stream, packaging)
+        return stream.getvalue()
+
+ARCHIVE_MANIFEST_NAME = 'manifest.csv'
+ARCHIVE_MANIFEST_FIELDS = ['claim', 'filename', 'size', 'status', 'error']
+
+def archive_manifest_path(archive_path, complete=True):
+    """Manifest CSV written next to a batch archive, or left in its place when the batch didn't finish"""
+    return f"{os.path.splitext(archive_path)[0]}_manifest{'' if complete else '_INCOMPLETE'}.csv"
+
+class BatchArchive:
+    """One ZIP file holding every report of a batch, written entry by entry as reports finish"""
+    def __init__(self, path):
+        self.path = path
+        # Built under temporary names; close() publishes them
+        self.temp_path = f"{path}.{os.getpid()}.tmp"
+        self.manifest_path = archive_manifest_path(path)
+        self.manifest_temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        self.names = set()
+        # A .docx is already a deflated ZIP, so reports are stored without compressing them again
+        self.zip_file = zipfile.ZipFile(self.temp_path, 'w', zipfile.ZIP_STORED)
+        self.manifest_file = open(self.manifest_temp_path, 'w', encoding='utf-8', newline='')
+        self.manifest = csv.writer(self.manifest_file)
+        self.manifest.writerow(ARCHIVE_MANIFEST_FIELDS)
+    
+    def add(self, filename, data):
+        """Store one report; returns its path inside the archive"""
+        name = filename
+        stem, extension = os.path.splitext(filename)
+        copy_number = 2
+        while name in self.names:  # Two rows with the same claim, insured and address
+            name = f"{stem} ({copy_number}){extension}"
+            copy_number += 1
+        self.zip_file.writestr(zipfile.ZipInfo(name, time.localtime()[:6]), data)
+        self.names.add(name)
+        return os.path.join(self.path, name)
+    
+    def record(self, result):
+        """Add a claim's row to the manifest, whatever its outcome"""
+        saved = result.status == 'success'
+        self.manifest.writerow([
+            result.claim,
+            os.path.basename(result.path) if saved else '',
+            result.metrics.bytes_written if saved else '',
+            result.status,
+            result.error or '',
+        ])
+    
+    def close(self, complete=True, reason=''):
+        """Publish the archive with manifest.csv inside it and next to it as _manifest.csv
+        
+        With complete unset (a failed or cancelled batch) the archive is discarded and
+        only a _manifest_INCOMPLETE.csv is kept, ending with a row that gives the reason.
+        An earlier archive of the same name is left untouched either way.
+        """
+        if not complete:
+            self.manifest.writerow(['', '', '', 'incomplete', reason])
+            self.manifest_file.close()
+            self.zip_file.close()
+            os.remove(self.temp_path)
+            os.replace(self.manifest_temp_path, archive_manifest_path(self.path, complete=False))
+            logging.warning(f"Batch archive {self.path} not saved: {reason}")
+            return
+        self.manifest_file.close()
+        self.zip_file.write(self.manifest_temp_path, ARCHIVE_MANIFEST_NAME)
+        self.zip_file.close()
+        os.replace(self.temp_path, self.path)
+        os.replace(self.manifest_temp_path, self.manifest_path)
+        incomplete_path = archive_manifest_path(self.path, complete=False)
+        if os.path.exists(incomplete_path):
+            os.remove(incomplete_path)  # Left over from an earlier attempt at this archive
+
+class ReportPipeline:
+    """Serialize and write stages on their own threads, connected by bounded queues"""
+    def __init__(self, output_folder_path, finish, packaging=DEFAULT_PACKAGING, depth=PIPELINE_DEPTH, archive=None):
+        self.output_folder_path = output_folder_path
+        self.finish = finish
+        self.packaging = packaging
+        self.archive = archive
+        # At most depth reports wait in each queue, so a slow disk holds the builder back
+        # instead of piling up finished documents in memory
+        self.serialize_queue = queue.Queue(depth)
+        self.write_queue = queue.Queue(depth)
+        self.threads = [
+            threading.Thread(target=self.serialize_stage, name="report-serialize", daemon=True),
+            threading.Thread(target=self.write_stage, name="report-write", daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+    
+    def put(self, item, inputs=None):
+        """Queue a PendingReport, or a ClaimResult for a claim that needs no writing
+        
+        Skipped and failed claims go through the queues too, so finish(result, inputs)
+        is only ever called from the writer thread, in the order claims were put.
+        """
+        self.serialize_queue.put((item, inputs))
+    
+    def close(self):
+        """Wait for every queued report to be written"""
+        self.serialize_queue.put(None)
+        for thread in self.threads:
+            thread.join()
+    
+    def serialize_stage(self):
+        while True:
+            entry = self.serialize_queue.get()
+            if entry is not None:
+                item, inputs = entry
+                if isinstance(item, PendingReport) and not isinstance(item.document, bytes):
+                    try:
+                        item = item._replace(document=serialize_report(item.document, item.metrics, self.packaging))
+                    except Exception as e:
+                        logging.exception(f"Error serializing report for claim: {item.claim}",
+                                          extra={'claim': item.claim, 'stage': 'serialize'})
+                        item = ClaimResult(item.index, item.claim, 'failed', None, str(e), item.metrics)
+                entry = (item, inputs)
+            self.write_queue.put(entry)
+            if entry is None:
+                return
+    
+    def write_stage(self):
+        while True:
+            entry = self.write_queue.get()
+            if entry is None:
+                return
+            item, inputs = entry
+            if isinstance(item, PendingReport):
+                item = self.write(item)
+            try:
+                # With an archive, every claim is listed in its manifest, whatever its outcome
+                if self.archive is not None:
+                    self.archive.record(item)
+                self.finish(item, inputs)
+            except Exception:
+                logging.exception(f"Error finishing claim: {item.claim}")
+    
+    def write(self, report):
+        try:
+            with report.metrics.stage('write'):
+                if self.archive is not None:
+                    save_path = self.archive.add(report.filename, report.document)
+                else:
+                    save_path = os.path.join(self.output_folder_path, report.filename)
+                    atomic_write(save_path, report.document)
+            report.metrics.bytes_written = len(report.document)
+            logging.info(f"Saved report: {save_path}", extra={'claim': report.claim, 'stage': 'write'})
+            return ClaimResult(report.index, report.claim, 'success', save_path, None, report.metrics)
         except Exception as e:
-            logging.exception("Error during initialization")
-            messagebox.showerror("Critical Error", f"Initialization failed: {str(e)}\nSee log file for details.")
+            logging.exception(f"Error writing report for claim: {report.claim}",
+                              extra={'claim': report.claim, 'stage': 'write'})
+            return ClaimResult(report.index, report.claim, 'failed', None, str(e), report.metrics)
+
+MANIFEST_NAME = '.report_manifest.jsonl'
+MANIFEST_VERSION = 4
+
+def fingerprint(data):
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+class BuildManifest:
+    """Record of the inputs every report in the output folder was built from
     
-    def select_input_file(self):
+    Keyed by report filename. Stored as JSON lines: a line is appended as soon as
+    a report is saved, so an interrupted batch resumes where it stopped. Later
+    lines win, and the file is compacted at the end of each batch.
+    """
+    def __init__(self, output_folder_path):
+        self.output_folder_path = output_folder_path
+        self.path = os.path.join(output_folder_path, MANIFEST_NAME)
+        self.entries = {}
+        self.load()
+    
+    def load(self):
         try:
-            file_path = filedialog.askopenfilename(
-                filetypes=[("Excel/CSV Files", "*.xlsx *.csv"), ("All Files", "*.*")]
-            )
-            if file_path:
-                self.input_file_path = file_path
-                self.input_file_label.config(text=os.path.basename(file_path))
-                self.status_label.config(text="Input file selected", fg="blue")
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Partly written line from an interrupted run
+                    self.entries[entry['filename']] = entry
+        except FileNotFoundError:
+            pass
         except Exception as e:
-            logging.exception("Error selecting input file")
-            messagebox.showerror("Error", f"Error selecting input file: {str(e)}")
+            logging.error(f"Error reading build manifest {self.path}: {str(e)}")
     
-    def select_images_folder(self):
+    def is_current(self, filename, inputs):
+        """True if the report exists and was built from exactly these inputs"""
+        entry = self.entries.get(filename)
+        return (entry is not None and entry.get('inputs') == inputs
+                and os.path.exists(os.path.join(self.output_folder_path, filename)))
+    
+    def record(self, filename, claim, inputs):
+        entry = {'filename': filename, 'claim': str(claim), 'inputs': inputs}
+        self.entries[filename] = entry
         try:
-            folder_path = filedialog.askdirectory()
-            if folder_path:
-                self.images_folder_path = folder_path
-                self.images_folder_label.config(text=os.path.basename(folder_path))
-                self.status_label.config(text="Images folder selected", fg="blue")
-                
-                # Look for header and footer images
-                self.find_header_footer_images()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
         except Exception as e:
-            logging.exception("Error selecting images folder")
-            messagebox.showerror("Error", f"Error selecting images folder: {str(e)}")
+            logging.error(f"Error updating build manifest {self.path}: {str(e)}")
     
-    def find_header_footer_images(self):
-        """Find header and footer images in the images folder"""
+    def compact(self):
+        """Rewrite the manifest with one line per report"""
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry) + '\n')
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logging.error(f"Error compacting build manifest {self.path}: {str(e)}")
+
+class ReportEngine:
+    """Builds inspection reports from claim rows without any GUI dependency"""
+    def __init__(self, images_folder_path="", output_folder_path="",
+                 image_cache_dir=DEFAULT_IMAGE_CACHE_DIR, image_dpi=200, photo_index=None,
+                 placeholder_cache_dir=DEFAULT_PLACEHOLDER_CACHE_DIR, backend='docx',
+                 per_claim_folders=False, packaging=DEFAULT_PACKAGING):
+        self.images_folder_path = images_folder_path
+        self.output_folder_path = output_folder_path
+        self.image_cache_dir = image_cache_dir
+        self.image_dpi = image_dpi
+        self.image_cache = ImageCache(image_cache_dir, dpi=image_dpi)
+        self.photo_validator = PhotoValidator(image_cache_dir)
+        self.bad_photos = {}
+        scan_started = time.perf_counter()
+        # With per_claim_folders, images_folder_path holds one photo folder per claim
+        self.per_claim_folders = per_claim_folders
+        index_class = ClaimPhotoIndex if per_claim_folders else PhotoIndex
+        self.photo_index = photo_index or index_class(images_folder_path)
+        self.scan_seconds = time.perf_counter() - scan_started
+        self.placeholder_cache_dir = placeholder_cache_dir
+        self.placeholder_cache = PlaceholderCache(placeholder_cache_dir)
+        # 'docx' builds through python-docx; 'ooxml' writes the package directly
+        self.backend = backend
+        self.packaging = PackagingOptions(*packaging)
+        self.template = None
+        self.claim_metrics = ClaimMetrics()
+        self.batch_metrics = None
         self.header_image_path = None
         self.footer_image_path = None
-        
-        if not self.images_folder_path or not os.path.exists(self.images_folder_path):
-            return
-            
-        for file in os.listdir(self.images_folder_path):
-            if file.lower().endswith(('.jpg', '.jpeg', '.png')):
-                lower_name = file.lower()
-                if 'header' in lower_name:
-                    self.header_image_path = os.path.join(self.images_folder_path, file)
-                elif 'footer' in lower_name:
-                    self.footer_image_path = os.path.join(self.images_folder_path, file)
+        self.find_header_footer_images()
     
-    def select_output_folder(self):
+    def find_header_footer_images(self):
+        """Take the header and footer images from the photo index"""
+        self.header_image_path = self.photo_index.header_image_path
+        self.footer_image_path = self.photo_index.footer_image_path
+    
+    def refresh_photo_index(self, check_images=False):
+        """Pick up new or changed photos since the index was built; returns True if anything changed"""
+        if self.photo_index.refresh(check_images):
+            self.find_header_footer_images()
+            self.template = None
+            return True
+        return False
+    
+    def get_template(self):
+        """Compile the report template on first use and reuse it for the rest of the batch"""
+        if self.template is None:
+            header_image = self.image_cache.get(self.header_image_path, BANNER_BOX) if self.header_image_path else None
+            footer_image = self.image_cache.get(self.footer_image_path, BANNER_BOX) if self.footer_image_path else None
+            self.template = ReportTemplate(header_image, footer_image, {
+                'scope_intro': self.add_scope_intro,
+                'conclusion': self.add_conclusion,
+            })
+        return self.template
+    
+    def engine_options(self):
+        """Constructor arguments used to rebuild this engine inside a worker process"""
+        return {
+            'images_folder_path': self.images_folder_path,
+            'output_folder_path': self.output_folder_path,
+            'image_cache_dir': self.image_cache_dir,
+            'image_dpi': self.image_dpi,
+            'photo_index': self.photo_index,
+            'placeholder_cache_dir': self.placeholder_cache_dir,
+            'backend': self.backend,
+            'per_claim_folders': self.per_claim_folders,
+            'packaging': self.packaging,
+        }
+    
+    def photos_for(self, claim_data):
+        """Photo index for this claim's front photo and rooms"""
+        return self.photo_index.for_claim(claim_data.claim_number)
+    
+    def collect_image_jobs(self):
+        """List every (image path, box) pair the reports in this batch will embed"""
+        jobs = []
+        for banner_path in (self.header_image_path, self.footer_image_path):
+            if banner_path:
+                jobs.append((banner_path, BANNER_BOX))
+        for photos in self.photo_index.all_indexes():
+            if photos.front_photo_path:
+                jobs.append((photos.front_photo_path, PHOTO_BOX))
+            for room in photos.room_names():
+                for photo_path in photos.room_photos(room)[:MAX_ROOM_PHOTOS]:
+                    jobs.append((photo_path, PHOTO_BOX))
+        return jobs
+    
+    def validate_photos(self):
+        """Check every indexed photo up front; photos that fail are left out of the reports"""
+        self.bad_photos = self.photo_validator.validate(self.photo_index.image_paths())
+        self.photo_index.set_bad_images(self.bad_photos)
+        header_footer = (self.header_image_path, self.footer_image_path)
+        self.find_header_footer_images()
+        if (self.header_image_path, self.footer_image_path) != header_footer:
+            self.template = None
+        for check in self.bad_photos.values():
+            logging.warning(f"Skipping unreadable photo {check.path}: {check.error}")
+        return self.bad_photos
+    
+    def prepare_images(self, executor=None):
+        """Preprocessing stage: decode and downscale every photo once before any report is built"""
+        jobs = self.collect_image_jobs()
+        if executor is None:
+            for path, box in jobs:
+                self.image_cache.get(path, box)
+        else:
+            list(executor.map(_prepare_image_in_worker, jobs))
+        logging.info(f"Prepared {len(jobs)} images for the batch")
+    
+    def read_claims(self, input_file_path):
+        """Stream (row index, claim data) pairs from the input file"""
+        logging.info(f"Reading input file: {input_file_path}")
+        return iter_claims(input_file_path)
+    
+    def process_claim(self, index, claim_data):
+        """Generate one report, turning any failure into a result instead of raising"""
+        claim = claim_data.claim_number
+        metrics = ClaimMetrics()
+        try:
+            save_path = self.generate_single_report(claim_data, metrics)
+            return ClaimResult(index, claim, 'success', save_path, None, metrics)
+        except Exception as e:
+            logging.exception(f"Error processing claim: {claim}", extra={'claim': claim})
+            return ClaimResult(index, claim, 'failed', None, str(e), metrics)
+    
+    def build_claim(self, index, claim_data, serialize=False):
+        """Build stage of the pipeline: a PendingReport, or a failed ClaimResult
+        
+        With serialize set the document is packaged right away, as worker processes
+        do before sending a report back.
+        """
+        claim = claim_data.claim_number
+        metrics = ClaimMetrics()
         try:
-            folder_path = filedialog.askdirectory()
-            if folder_path:
-                self.output_folder_path = folder_path
-                self.output_folder_label.config(text=os.path.basename(folder_path))
-                self.status_label.config(text="Output folder selected", fg="blue")
+            filename = self.build_report_filename(claim_data)
+            doc = self.build_report(claim_data, metrics)
+            if serialize:
+                doc = serialize_report(doc, metrics, self.packaging)
+            return PendingReport(index, claim, filename, doc, metrics)
         except Exception as e:
-            logging.exception("Error selecting output folder")
-            messagebox.showerror("Error", f"Error selecting output folder: {str(e)}")
+            logging.exception(f"Error processing claim: {claim}", extra={'claim': claim})
+            return ClaimResult(index, claim, 'failed', None, str(e), metrics)
     
-    def generate_reports(self):
+    def profile_claim(self, input_file_path, claim_number, stats_path):
+        """Generate the report for one claim under cProfile and save the stats to stats_path"""
+        for idx, claim_data in self.read_claims(input_file_path):
+            if claim_data.claim_number.strip() == str(claim_number).strip():
+                break
+        else:
+            raise ValueError(f"Claim {claim_number} not found in {input_file_path}")
+        
+        self.prepare_images()
+        profiler = cProfile.Profile()
+        result = profiler.runcall(self.process_claim, idx, claim_data)
+        profiler.dump_stats(stats_path)
+        logging.info(f"Saved profile for claim {claim_number}: {stats_path}")
+        return result, pstats.Stats(profiler)
+    
+    def compare_packaging(self, input_file_path, sample=5, choices=PACKAGING_CHOICES):
+        """Package the first sample reports with each choice of options, without writing any files
+        
+        Returns one dict per choice with the total serialize time and .docx size,
+        so the size saved by each choice can be weighed against the time it costs.
+        """
+        self.prepare_images()
+        docs = []
+        for idx, claim_data in self.read_claims(input_file_path):
+            if len(docs) >= sample:
+                break
+            docs.append(self.build_report(claim_data))
+        
+        comparison = []
+        for packaging in choices:
+            metrics = ClaimMetrics()
+            size = sum(len(serialize_report(doc, metrics, packaging)) for doc in docs)
+            comparison.append({
+                'packaging': describe_packaging(packaging),
+                'store_media': packaging.store_media,
+                'deflate_level': packaging.deflate_level,
+                'reports': len(docs),
+                'seconds': metrics.total,
+                'bytes': size,
+            })
+        return comparison
+    
+    def generate_reports(self, input_file_path, workers=1, progress_callback=None, cancel_event=None,
+                         incremental=True, strict_photos=False, claims=None, archive_path=None):
+        """Generate the report of every claim in the input file, or of the given (row index, claim) pairs"""
+        self.batch_metrics = BatchMetrics()
+        self.batch_metrics.stages['scan'] = self.scan_seconds
+        with self.batch_metrics.stage('validate_photos'):
+            bad_photos = self.validate_photos()
+        report_path = os.path.join(self.output_folder_path, BAD_PHOTOS_REPORT_NAME)
+        if bad_photos:
+            report_path = write_bad_photos_report(self.output_folder_path, bad_photos)
+            if strict_photos:
+                raise PhotoValidationError(bad_photos, report_path)
+        elif os.path.exists(report_path):
+            os.remove(report_path)  # Left over from a run whose bad photos have since been fixed
+        
+        if claims is None:
+            claims = self.read_claims(input_file_path)
+            total_count = estimate_claim_count(input_file_path)
+        else:
+            claims = list(claims)
+            total_count = len(claims)
+        claims = self.batch_metrics.timed_claims(claims)
+        archive = BatchArchive(archive_path) if archive_path else None
+        # An archive holds the whole batch, so nothing is skipped when writing one
+        manifest = BuildManifest(self.output_folder_path) if incremental and archive is None else None
+        results = []
+        
+        def finish(result, inputs=None):
+            if manifest is not None and result.status == 'success' and inputs is not None:
+                manifest.record(os.path.basename(result.path), result.claim, inputs)
+            results.append(result)
+            self.batch_metrics.add(result)
+            if progress_callback:  # total is None when the row count isn't known up front
+                progress_callback(len(results), total_count, result)
+        
+        def cancelled():
+            # No new claims are started; the ones already being built still finish
+            return cancel_event is not None and cancel_event.is_set()
+        
+        def check_manifest(idx, claim_data):
+            """Return (skip result or None, inputs to record once the report is saved)"""
+            if manifest is None:
+                return None, None
+            try:
+                filename = self.build_report_filename(claim_data)
+                inputs = self.claim_inputs(claim_data)
+            except Exception:
+                return None, None  # Let generation report the problem with this row
+            if manifest.is_current(filename, inputs):
+                save_path = os.path.join(self.output_folder_path, filename)
+                return ClaimResult(idx, claim_data.claim_number, 'skipped', save_path, None), inputs
+            return None, inputs
+        
+        pipeline = ReportPipeline(self.output_folder_path, finish, self.packaging, archive=archive)
+        archive_problem = "batch stopped by an error"
         try:
-            if not all([self.input_file_path, self.images_folder_path, self.output_folder_path]):
-                messagebox.showerror("Error", "Please select all required files and folders")
-                return
-            
-            self.status_label.config(text="Processing...", fg="orange")
-            self.root.update()  # Force UI update
-            
-            # Read input file
-            logging.info(f"Reading input file: {self.input_file_path}")
-            if self.input_file_path.endswith('.csv'):
-                df = pd.read_csv(self.input_file_path)
+            if workers <= 1:
+                with self.batch_metrics.stage('prepare_images'):
+                    self.prepare_images()
+                for idx, claim_data in claims:
+                    if cancelled():
+                        logging.info("Batch cancelled")
+                        break
+                    skipped, inputs = check_manifest(idx, claim_data)
+                    if skipped:
+                        pipeline.put(skipped)
+                        continue
+                    pipeline.put(self.build_claim(idx, claim_data), inputs)
             else:
-                df = pd.read_excel(self.input_file_path)
-            
-            # Process each claim
-            success_count = 0
-            total_count = len(df)
-            for idx, row in df.iterrows():
+                self.generate_in_pool(claims, workers, pipeline, cancelled, check_manifest)
+            archive_problem = "batch cancelled" if cancelled() else None
+        except Exception as e:
+            archive_problem = f"batch stopped by an error: {e}"
+            raise
+        finally:
+            pipeline.close()
+            self.image_cache.evict()
+            if archive is not None:
+                archive.close(complete=archive_problem is None, reason=archive_problem)
+            if manifest is not None:
+                manifest.compact()
+            self.batch_metrics.finish()
+        
+        results.sort(key=lambda result: result.index)
+        return results
+    
+    def start_pool(self, workers):
+        """Process pool whose workers each rebuild this engine"""
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(self.engine_options(), _log_queue, logging.getLogger().level))
+    
+    def generate_in_pool(self, claims, workers, pipeline, cancelled, check_manifest):
+        """Spread claims over a process pool, keeping a bounded number in flight
+        
+        Workers build and serialize; the reports come back as bytes and are written
+        by the pipeline's writer thread. If a worker process dies, the pool is
+        restarted and the claims that were in flight are retried one at a time, so
+        only the claim that kills its worker is reported as failed.
+        """
+        max_pending = workers * 4
+        executor = self.start_pool(workers)
+        futures = {}
+        interrupted = []  # Claims lost with a worker process that died
+        
+        def collect(done):
+            for future in done:
+                idx, claim_data, inputs = futures.pop(future)
+                if future.cancelled():
+                    continue
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    interrupted.append((idx, claim_data, inputs))
+                    continue
+                except Exception as e:
+                    logging.exception(f"Worker failed on claim: {claim_data.claim_number}",
+                                      extra={'claim': claim_data.claim_number})
+                    result = ClaimResult(idx, claim_data.claim_number, 'failed', None, str(e))
+                pipeline.put(result, inputs)
+        
+        def restart_pool():
+            nonlocal executor
+            if futures:
+                collect(wait(futures).done)  # Every future of a broken pool fails straight away
+            executor.shutdown(wait=True)
+            executor = self.start_pool(workers)
+            logging.warning(f"A worker process died; retrying {len(interrupted)} claims one at a time")
+            retry = list(interrupted)
+            interrupted.clear()
+            for idx, claim_data, inputs in retry:
+                if cancelled():
+                    return
                 try:
-                    self.status_label.config(text=f"Processing {idx+1}/{total_count}: {row.get('CLAIM #', 'Unknown')}")
-                    self.root.update()
-                    self.generate_single_report(row)
-                    success_count += 1
+                    result = executor.submit(_build_claim_in_worker, idx, claim_data).result()
+                except BrokenProcessPool as e:
+                    logging.error(f"Worker process died building claim: {claim_data.claim_number}",
+                                  extra={'claim': claim_data.claim_number})
+                    result = ClaimResult(idx, claim_data.claim_number, 'failed', None,
+                                         f"Worker process died: {e}")
+                    executor.shutdown(wait=True)
+                    executor = self.start_pool(workers)
                 except Exception as e:
-                    logging.exception(f"Error processing claim: {row.get('CLAIM #', 'Unknown')}")
+                    logging.exception(f"Worker failed on claim: {claim_data.claim_number}",
+                                      extra={'claim': claim_data.claim_number})
+                    result = ClaimResult(idx, claim_data.claim_number, 'failed', None, str(e))
+                pipeline.put(result, inputs)
+        
+        try:
+            with self.batch_metrics.stage('prepare_images'):
+                try:
+                    self.prepare_images(executor)
+                except BrokenProcessPool:
+                    # Whatever wasn't prepared yet is prepared by the workers as they need it
+                    logging.warning("A worker process died while preparing images")
+                    executor.shutdown(wait=True)
+                    executor = self.start_pool(workers)
             
-            self.status_label.config(text=f"Generated {success_count}/{total_count} reports", fg="green")
-            messagebox.showinfo("Success", f"Successfully generated {success_count} out of {total_count} reports")
-        except Exception as e:
-            logging.exception("Error generating reports")
-            self.status_label.config(text="Error - see log", fg="red")
-            messagebox.showerror("Error", f"An error occurred: {str(e)}\nSee log file for details.")
+            for idx, claim_data in claims:
+                if cancelled():
+                    break
+                skipped, inputs = check_manifest(idx, claim_data)
+                if skipped:
+                    pipeline.put(skipped)
+                    continue
+                if len(futures) >= max_pending:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    collect(done)
+                if interrupted:
+                    restart_pool()
+                try:
+                    futures[executor.submit(_build_claim_in_worker, idx, claim_data)] = (idx, claim_data, inputs)
+                except BrokenProcessPool:
+                    interrupted.append((idx, claim_data, inputs))
+                    restart_pool()
+            while futures or interrupted:
+                if cancelled():
+                    logging.info("Batch cancelled")
+                    for future in futures:
+                        future.cancel()
+                if futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    collect(done)
+                if interrupted and cancelled():
+                    interrupted.clear()
+                elif interrupted:
+                    restart_pool()
+        finally:
+            executor.shutdown(wait=True)
     
-    def generate_single_report(self, claim_data):
-        # Create document
-        doc = Document()
+    def claim_inputs(self, claim_data):
+        """Everything a claim's report is built from, as recorded in the build manifest"""
+        index = self.photos_for(claim_data)
         
-        # Add header image if found
-        if self.header_image_path:
-            try:
-                header = doc.sections[0].header
-                header.is_linked_to_previous = False
-                paragraph = header.paragraphs[0] if header.paragraphs else header.add_paragraph()
-                paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                run = paragraph.add_run()
-                run.add_picture(self.header_image_path, width=Inches(6))
-                # Add space after header
-                doc.add_paragraph("\n\n")
-            except Exception as e:
-                logging.error(f"Error adding header image: {str(e)}")
+        def image_entry(path, index=index):
+            return [path, index.image_mtimes.get(path)] if path else None
         
-        # Set default font
-        style = doc.styles['Normal']
-        font = style.font
-        font.name = 'Arial'
-        font.size = Pt(10)
+        photos = [image_entry(index.front_photo_path)]
+        for room in index.room_names():
+            photos.extend(image_entry(path) for path in index.room_photos(room)[:MAX_ROOM_PHOTOS])
+        return {
+            'version': MANIFEST_VERSION,
+            'row': fingerprint(claim_data),
+            'rooms': index.room_names(),
+            'photos': photos,
+            'header': image_entry(self.header_image_path, self.photo_index),
+            'footer': image_entry(self.footer_image_path, self.photo_index),
+            'image_dpi': self.image_dpi,
+            'backend': self.backend,
+            'packaging': list(self.packaging),
+        }
+    
+    def build_report_filename(self, claim_data):
+        return claim_data.filename
+    
+    def generate_single_report(self, claim_data, metrics=None):
+        metrics = metrics or ClaimMetrics()
+        doc = self.build_report(claim_data, metrics)
         
-        # Add title
-        title = doc.add_heading('FIRST INSPECTION REPORT', level=1)
-        title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        # Save document
+        filename = self.build_report_filename(claim_data)
+        save_path = os.path.join(self.output_folder_path, filename)
+        data = serialize_report(doc, metrics, self.packaging)
+        with metrics.stage('write'):
+            atomic_write(save_path, data)
+        metrics.bytes_written = len(data)
+        logging.info(f"Saved report: {save_path}")
+        return save_path
+    
+    def build_report(self, claim_data, metrics=None):
+        """Assemble the report for one claim in memory, ready to be saved"""
+        # Section builders count images and placeholders into the current claim's metrics
+        metrics = self.claim_metrics = metrics or ClaimMetrics()
+        if self.per_claim_folders and self.photos_for(claim_data) is EMPTY_PHOTO_INDEX:
+            logging.warning(f"No photo folder found for claim {claim_data.claim_number} "
+                            f"in {self.images_folder_path}, using placeholders",
+                            extra={'claim': claim_data.claim_number})
+        
+        # Clone the template: styles, header/footer images and title are already in place
+        with metrics.stage('template'):
+            template = self.get_template()
+            doc = template.new_document(self.backend)
         
         # Add insured information
-        self.add_insured_info(doc, claim_data)
+        with metrics.stage('insured_info'):
+            self.add_insured_info(doc, claim_data)
         
         # Add front photo
-        self.add_front_photo(doc, claim_data)
+        with metrics.stage('front_photo'):
+            self.add_front_photo(doc, claim_data)
         
         # Add Cause of Loss
-        self.add_cause_of_loss(doc, claim_data)
+        with metrics.stage('cause_of_loss'):
+            self.add_cause_of_loss(doc, claim_data)
         
         # Add Scope of Work
-        self.add_scope_of_work(doc, claim_data)
+        with metrics.stage('scope_of_work'):
+            self.add_scope_of_work(doc, claim_data)
         
-        # Add Recommended Reserves
-        self.add_recommended_reserves(doc)
+        # Add Recommended Reserves - seeded per claim so serial and parallel runs match
+        with metrics.stage('reserves'):
+            rng = random.Random(claim_data.claim_number)
+            self.add_recommended_reserves(doc, rng)
         
         # Add Conclusion
-        self.add_conclusion(doc)
+        with metrics.stage('conclusion'):
+            template.append_fragment(doc, 'conclusion')
         
         # Add room photos - now using folder names
-        self.add_room_photos_from_folders(doc, claim_data)
-        
-        # Add footer image if found
-        if self.footer_image_path:
-            try:
-                # Add space before footer
-                doc.add_paragraph("\n\n")
-                footer = doc.sections[0].footer
-                footer.is_linked_to_previous = False
-                paragraph = footer.paragraphs[0] if footer.paragraphs else footer.add_paragraph()
-                paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                run = paragraph.add_run()
-                run.add_picture(self.footer_image_path, width=Inches(6))
-            except Exception as e:
-                logging.error(f"Error adding footer image: {str(e)}")
+        with metrics.stage('room_photos'):
+            self.add_room_photos_from_folders(doc, claim_data)
         
-        # Save document
-        filename = f"FIRST INSPECTION REPORT - CLAIM# {claim_data.get('CLAIM #', 'PR0000')} - {claim_data.get('INSURED/POLICYHOLDER', 'UNKNOWN').split()[0].upper()} - {claim_data.get('ADDRESS', 'UNKNOWN').replace(',', '').replace(' ', '_')}.docx"
-        save_path = os.path.join(self.output_folder_path, filename)
-        doc.save(save_path)
-        logging.info(f"Saved report: {save_path}")
+        # Add space before footer (only present if the footer image was found)
+        with metrics.stage('footer'):
+            template.append_fragment(doc, 'footer_spacer')
+        return doc
     
     def add_insured_info(self, doc, claim_data):
-        doc.add_paragraph(f"INSURED/POLICYHOLDER: {claim_data.get('INSURED/POLICYHOLDER', 'Unknown')}")
-        doc.add_paragraph(f"ADDRESS: {claim_data.get('ADDRESS', 'Unknown')}")
-        doc.add_paragraph(f"INSURER: {claim_data.get('INSURER', 'Unknown')}")
-        doc.add_paragraph(f"CLAIM #: {claim_data.get('CLAIM #', 'PR0000')}")
-        doc.add_paragraph(f"ADJUSTER/ CLAIM REP: {claim_data.get('ADJUSTER/ CLAIM REP', 'Unknown')}")
-        
-        # Format dates consistently
-        inspection_date = claim_data.get('DATE OF INSPECTION', 'Unknown')
-        loss_date = claim_data.get('DATE OF LOSS', 'Unknown')
-        report_date = claim_data.get('DATE OF REPORT', 'Unknown')
-        
-        doc.add_paragraph(f"DATE OF INSPECTION: {inspection_date}")
-        doc.add_paragraph(f"DATE OF LOSS: {loss_date}")
-        doc.add_paragraph(f"DATE OF REPORT: {report_date}")
-        doc.add_paragraph(f"TYPE OF LOSS: {claim_data.get('TYPE OF LOSS', 'Unknown')}")
+        doc.add_paragraph(f"INSURED/POLICYHOLDER: {claim_data.insured}")
+        doc.add_paragraph(f"ADDRESS: {claim_data.address}")
+        doc.add_paragraph(f"INSURER: {claim_data.insurer}")
+        doc.add_paragraph(f"CLAIM #: {claim_data.claim_number}")
+        doc.add_paragraph(f"ADJUSTER/ CLAIM REP: {claim_data.adjuster}")
+        
+        # Dates were formatted consistently when the claims were read
+        doc.add_paragraph(f"DATE OF INSPECTION: {claim_data.inspection_date}")
+        doc.add_paragraph(f"DATE OF LOSS: {claim_data.loss_date}")
+        doc.add_paragraph(f"DATE OF REPORT: {claim_data.report_date}")
+        doc.add_paragraph(f"TYPE OF LOSS: {claim_data.loss_type}")
         
         doc.add_paragraph()  # Add empty line
     
     def add_front_photo(self, doc, claim_data):
         # Try to find front photo
-        front_photo_path = self.find_photo('front', 'exterior', 'house')
+        front_photo_path = self.photos_for(claim_data).front_photo_path
         if front_photo_path:
             doc.add_paragraph("Front Photo:")
-            doc.add_picture(front_photo_path, width=Inches(3.25), height=Inches(2.25))
+            doc.add_picture(self.image_cache.get(front_photo_path, PHOTO_BOX),
+                            width=Inches(3.25), height=Inches(2.25))
+            self.claim_metrics.images += 1
             last_paragraph = doc.paragraphs[-1]
             last_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
             doc.add_paragraph("Image 1")
@@ -272,10 +2380,11 @@ class ReportGenerator:
             last_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
         else:
             # Create placeholder if no front photo found
-            placeholder = self.create_placeholder_image("Front of House", claim_data.get('ADDRESS', 'Unknown'))
+            placeholder = self.create_placeholder_image("Front of House")
             if placeholder:
                 doc.add_paragraph("Front Photo:")
                 doc.add_picture(placeholder, width=Inches(3.25), height=Inches(2.25))
+                self.claim_metrics.placeholders += 1
                 last_paragraph = doc.paragraphs[-1]
                 last_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
                 doc.add_paragraph("Image 1 - Placeholder")
@@ -288,38 +2397,33 @@ class ReportGenerator:
     
     def add_cause_of_loss(self, doc, claim_data):
         doc.add_paragraph("CAUSE OF LOSS:", style='Heading 2')
-        cause = claim_data.get('CAUSE OF LOSS', 'Unknown cause of loss')
-        doc.add_paragraph(cause)
+        doc.add_paragraph(claim_data.cause)
         doc.add_paragraph()  # Add empty line
     
-    def add_scope_of_work(self, doc, claim_data):
+    def add_scope_intro(self, doc):
         doc.add_paragraph("SCOPE OF WORK:", style='Heading 2')
         doc.add_paragraph("The following is a brief outline of the work to be completed on the contents portion of this claim.")
         doc.add_paragraph()
+    
+    def add_scope_of_work(self, doc, claim_data):
+        self.get_template().append_fragment(doc, 'scope_intro')
         
-        scope = claim_data.get('SCOPE OF WORK', '')
-        if isinstance(scope, str):
-            # Split by <br> tags or numbers
-            items = [item.strip() for item in scope.split('<br>') if item.strip()]
-            if len(items) <= 1:  # If not split by <br>, try numbered items
-                items = [item.strip() for item in scope.split('\n') if item.strip()]
-            
-            for item in items:
-                # Clean up item (remove numbers if they exist)
-                clean_item = item.split('.', 1)[-1].strip() if '.' in item else item
-                doc.add_paragraph(f"• {clean_item}", style='List Bullet')
+        # Items were split and stripped of their numbering when the claims were read
+        if claim_data.scope_items:
+            for item in claim_data.scope_items:
+                doc.add_paragraph(f"• {item}", style='List Bullet')
         else:
             doc.add_paragraph("• Scope of work details not available", style='List Bullet')
         
         doc.add_paragraph()  # Add empty line
     
-    def add_recommended_reserves(self, doc):
+    def add_recommended_reserves(self, doc, rng=random):
         doc.add_paragraph("RECOMMENDED RESERVES FOR TRINITY'S INVOLVEMENT:", style='Heading 2')
         
         # Generate random but realistic amounts
-        indemnity = random.randint(15000, 30000)
-        pricing_expense = random.randint(3000, 6000)
-        total_replacement = random.randint(3000, 10000)
+        indemnity = rng.randint(15000, 30000)
+        pricing_expense = rng.randint(3000, 6000)
+        total_replacement = rng.randint(3000, 10000)
         
         doc.add_paragraph(f"The estimated cost for Trinity's involvement is as follows:")
         doc.add_paragraph(f"• Indemnity Work: Should not exceed ${indemnity:,.2f} plus HST")
@@ -346,15 +2450,14 @@ class ReportGenerator:
     
     def add_room_photos_from_folders(self, doc, claim_data):
         """Add photos organized by room folders"""
-        if not self.images_folder_path or not os.path.exists(self.images_folder_path):
+        photos = self.photos_for(claim_data)
+        # A claim without a photo folder still gets the default rooms, as placeholders
+        if photos is not EMPTY_PHOTO_INDEX and (not photos.images_folder_path
+                                                or not os.path.exists(photos.images_folder_path)):
             return
             
         # Get all room folders
-        room_folders = []
-        for item in os.listdir(self.images_folder_path):
-            item_path = os.path.join(self.images_folder_path, item)
-            if os.path.isdir(item_path):
-                room_folders.append(item)
+        room_folders = photos.room_names()
         
         # If no room folders found, use default rooms
         if not room_folders:
@@ -367,21 +2470,13 @@ class ReportGenerator:
         image_counter = 2
         
         for room in room_folders:
-            room_path = os.path.join(self.images_folder_path, room)
-            room_photos = []
-            
             # Get all valid image files from room folder
-            if os.path.exists(room_path) and os.path.isdir(room_path):
-                for file in os.listdir(room_path):
-                    if file.lower().endswith(('.jpg', '.jpeg', '.png')):
-                        room_photos.append(os.path.join(room_path, file))
+            room_photos = list(photos.room_photos(room))
             
             # If no photos found, create a placeholder
+            has_photos = bool(room_photos)
             if not room_photos:
-                placeholder = self.create_placeholder_image(
-                    f"{room.capitalize()} Area", 
-                    claim_data.get('ADDRESS', 'Unknown')
-                )
+                placeholder = self.create_placeholder_image(f"{room.capitalize()} Area")
                 if placeholder:
                     room_photos = [placeholder]
             
@@ -400,7 +2495,7 @@ class ReportGenerator:
                 
                 # Add photos to table
                 row = None
-                for i, photo_path in enumerate(room_photos[:4]):  # Max 4 photos per room
+                for i, photo_path in enumerate(room_photos[:MAX_ROOM_PHOTOS]):
                     if i % 2 == 0:
                         row = table.add_row()
                     
@@ -409,91 +2504,624 @@ class ReportGenerator:
                         # Add image to cell
                         cell_paragraph = cell.paragraphs[0]
                         run = cell_paragraph.add_run()
-                        run.add_picture(photo_path, width=Inches(3.25), height=Inches(2.25))
+                        image = self.image_cache.get(photo_path, PHOTO_BOX) if has_photos else photo_path
+                        run.add_picture(image, width=Inches(3.25), height=Inches(2.25))
+                        if has_photos:
+                            self.claim_metrics.images += 1
+                        else:
+                            self.claim_metrics.placeholders += 1
                         cell_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
                         
                         # Add image number
                         img_text = f"Image {image_counter}"
-                        if "placeholder" in photo_path.lower():
+                        if not has_photos:
                             img_text += " - Placeholder"
                         cell_paragraph = cell.add_paragraph(img_text)
                         cell_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
                         
                         image_counter += 1
                     except Exception as e:
-                        logging.error(f"Error adding image {photo_path}: {str(e)}")
-                        cell.text = f"Image not available\n{os.path.basename(photo_path)}"
+                        image_name = os.path.basename(photo_path) if has_photos else "placeholder"
+                        logging.error(f"Error adding image {image_name}: {str(e)}")
+                        cell.text = f"Image not available\n{image_name}"
                 
                 doc.add_paragraph()  # Add empty line
     
     def find_photo(self, *keywords):
         """Find a photo containing any of the keywords in its name"""
-        if not self.images_folder_path or not os.path.exists(self.images_folder_path):
+        return self.photo_index.find_photo(*keywords)
+    
+    def create_placeholder_image(self, title, subtitle=PLACEHOLDER_SUBTITLE):
+        """Return a stream with a placeholder image, rendered once per distinct text"""
+        try:
+            return io.BytesIO(self.placeholder_cache.get(title, subtitle))
+        except Exception as e:
+            logging.error(f"Error creating placeholder: {str(e)}")
             return None
-            
-        for file in os.listdir(self.images_folder_path):
-            if file.lower().endswith(('.jpg', '.jpeg', '.png')):
-                if any(keyword.lower() in file.lower() for keyword in keywords):
-                    return os.path.join(self.images_folder_path, file)
+
+# Process pool workers each hold their own engine, built once by the initializer
+_worker_engine = None
+
+def _init_worker(engine_options, log_queue=None, log_level=logging.INFO):
+    global _worker_engine
+    if log_queue is not None:
+        configure_worker_logging(log_queue, log_level)
+    _worker_engine = ReportEngine(**engine_options)
+
+def _prepare_image_in_worker(job):
+    path, box = job
+    _worker_engine.image_cache.get(path, box)
+
+def _build_claim_in_worker(index, claim_data):
+    return _worker_engine.build_claim(index, claim_data, serialize=True)
+
+WATCH_POLL_SECONDS = 2.0
+WATCH_SETTLE_SECONDS = 3.0
+
+def file_state(path):
+    """(mtime, size) of a file, or None if it can't be read"""
+    try:
+        stat = os.stat(path)
+    except OSError:
         return None
+    return stat.st_mtime_ns, stat.st_size
+
+class ClaimWatcher:
+    """Keeps the output folder up to date while the claims file and images folder are edited"""
+    def __init__(self, engine, input_file_path, workers=1, progress_callback=None, cancel_event=None,
+                 incremental=True, strict_photos=False, poll_seconds=WATCH_POLL_SECONDS,
+                 settle_seconds=WATCH_SETTLE_SECONDS, pass_started=None, pass_finished=None):
+        self.engine = engine
+        self.input_file_path = input_file_path
+        self.workers = workers
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event or threading.Event()
+        self.incremental = incremental
+        self.strict_photos = strict_photos
+        self.poll_seconds = poll_seconds
+        self.settle_seconds = settle_seconds
+        self.pass_started = pass_started
+        self.pass_finished = pass_finished
+        self.input_state = None
+        self.claims = None
+        self.built = {}
+        self.changed_at = None
+        self.results = []
+    
+    def run(self):
+        """Build everything that is out of date, then poll until cancel_event is set"""
+        self.input_state = file_state(self.input_file_path)
+        self.run_pass(reread=True)
+        while not self.cancel_event.wait(self.poll_seconds):
+            self.poll()
+        return self.results
     
-    def create_placeholder_image(self, title, subtitle):
-        """Create a placeholder image with text"""
+    def poll(self, now=None):
+        """Check for changes; run a pass once they have settled. Returns True if a pass ran
+        
+        Stats the input file, every known folder and every indexed photo, and does no
+        other I/O when nothing changed. A pass waits until nothing has changed for
+        settle_seconds, so a workbook being saved or photos being copied in is one pass.
+        """
+        now = time.monotonic() if now is None else now
+        input_state = file_state(self.input_file_path)
+        input_changed = input_state != self.input_state
+        if input_changed:
+            self.input_state = input_state
+            self.claims = None
         try:
-            # Check cache
-            cache_key = f"{title}_{subtitle}"
-            if cache_key in self.placeholder_cache:
-                return self.placeholder_cache[cache_key]
-                
-            # Create image
-            width, height = 800, 600
-            img = Image.new('RGB', (width, height), color=(230, 230, 230))
-            draw = ImageDraw.Draw(img)
+            photos_changed = self.engine.refresh_photo_index(check_images=True)
+        except OSError as e:
+            # A folder being copied, renamed or deleted right now; scan it again on the next poll
+            logging.warning(f"Watch: couldn't scan the images folder, retrying: {e}")
+            photos_changed = True
+        if photos_changed or input_changed:
+            self.changed_at = now
+            return False
+        if self.changed_at is None or now - self.changed_at < self.settle_seconds:
+            return False
+        self.changed_at = None
+        self.run_pass(reread=self.claims is None)
+        return True
+    
+    def run_pass(self, reread=False):
+        """Rebuild the claims whose row or photos differ from the last pass's snapshot"""
+        try:
+            if reread:
+                self.claims = list(self.engine.read_claims(self.input_file_path))
+            self.engine.validate_photos()  # Inputs below must leave out the photos generation will skip
+            changed = []
+            snapshot = {}
+            for idx, claim_data in self.claims:
+                try:
+                    inputs = fingerprint(self.engine.claim_inputs(claim_data))
+                except Exception:
+                    inputs = None  # Let generation report the problem with this row
+                snapshot[claim_data.filename] = inputs
+                if inputs is None or self.built.get(claim_data.filename) != inputs:
+                    changed.append((idx, claim_data))
+            if not changed:
+                logging.info("Watch: no claims affected by the change")
+                return []
+            
+            logging.info(f"Watch: regenerating {len(changed)} of {len(self.claims)} claims")
+            if self.pass_started:
+                self.pass_started(len(changed))
+            results = self.engine.generate_reports(
+                self.input_file_path, workers=min(self.workers, len(changed)),
+                progress_callback=self.progress_callback, cancel_event=self.cancel_event,
+                incremental=self.incremental, strict_photos=self.strict_photos, claims=changed)
+        except Exception:
+            # Most likely the workbook is mid-save; the next change triggers another pass
+            logging.exception("Watch: pass failed, waiting for the next change")
+            return []
+        
+        # Failed and cancelled claims stay out of the snapshot, so the next pass retries them
+        done = {result.index for result in results if result.status != 'failed'}
+        for idx, claim_data in changed:
+            if idx not in done:
+                snapshot[claim_data.filename] = None
+        self.built = {filename: inputs for filename, inputs in snapshot.items() if inputs is not None}
+        self.results.extend(results)
+        if self.pass_finished:
+            self.pass_finished(results)
+        return results
+
+PROGRESS_POLL_MS = 100
+# Set REPORT_GENERATOR_WARMUP=0 to load pandas/python-docx only on the first Generate click
+WARM_UP_IMPORTS = os.environ.get('REPORT_GENERATOR_WARMUP', '1') != '0'
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+class ReportGenerator:
+    def __init__(self):
+        try:
+            logging.info("Initializing application")
+            self.root = tk.Tk()
+            self.root.title("First Inspection Report Generator")
+            self.root.geometry("650x610")
             
-            # Add border
-            draw.rectangle([(10, 10), (width-10, height-10)], outline=(180, 180, 180), width=3)
+            # GUI Elements
+            tk.Label(self.root, text="First Inspection Report Generator", 
+                     font=("Arial", 16, "bold"), fg="navy").pack(pady=10)
             
-            # Add title
-            try:
-                title_font = ImageFont.truetype("arialbd.ttf", 40)
-            except:
-                title_font = ImageFont.load_default()
+            # Input file selection
+            file_frame = tk.Frame(self.root)
+            file_frame.pack(fill=tk.X, padx=20, pady=5)
+            tk.Button(file_frame, text="1. Select Input CSV/Excel File", 
+                      command=self.select_input_file, width=25).pack(side=tk.LEFT)
+            self.input_file_label = tk.Label(file_frame, text="No file selected", anchor="w")
+            self.input_file_label.pack(side=tk.LEFT, padx=10, fill=tk.X, expand=True)
             
-            title_width = draw.textlength(title, font=title_font) if hasattr(draw, 'textlength') else 400
-            draw.text(((width - title_width) // 2, height // 3), title, 
-                      fill=(100, 100, 100), font=title_font)
+            # Images folder selection
+            img_frame = tk.Frame(self.root)
+            img_frame.pack(fill=tk.X, padx=20, pady=5)
+            tk.Button(img_frame, text="2. Select Images Folder", 
+                      command=self.select_images_folder, width=25).pack(side=tk.LEFT)
+            self.images_folder_label = tk.Label(img_frame, text="No folder selected", anchor="w")
+            self.images_folder_label.pack(side=tk.LEFT, padx=10, fill=tk.X, expand=True)
             
-            # Add subtitle
-            try:
-                subtitle_font = ImageFont.truetype("arial.ttf", 30)
-            except:
-                subtitle_font = ImageFont.load_default()
+            # Output folder selection
+            out_frame = tk.Frame(self.root)
+            out_frame.pack(fill=tk.X, padx=20, pady=5)
+            tk.Button(out_frame, text="3. Select Output Folder", 
+                      command=self.select_output_folder, width=25).pack(side=tk.LEFT)
+            self.output_folder_label = tk.Label(out_frame, text="No folder selected", anchor="w")
+            self.output_folder_label.pack(side=tk.LEFT, padx=10, fill=tk.X, expand=True)
+            
+            # Incremental runs
+            self.skip_unchanged = tk.BooleanVar(value=True)
+            tk.Checkbutton(self.root, text="Skip reports whose claim data and photos are unchanged",
+                           variable=self.skip_unchanged).pack(padx=20, anchor="w")
+            
+            # One photo folder per claim under the images folder
+            self.per_claim_folders = tk.BooleanVar(value=False)
+            tk.Checkbutton(self.root, text="Images folder has one subfolder per claim (matched by CLAIM #)",
+                           variable=self.per_claim_folders).pack(padx=20, anchor="w")
             
-            subtitle_width = draw.textlength(subtitle, font=subtitle_font) if hasattr(draw, 'textlength') else 400
-            draw.text(((width - subtitle_width) // 2, height // 2), subtitle, 
-                      fill=(150, 150, 150), font=subtitle_font)
+            # One ZIP with every report instead of separate files
+            self.single_archive = tk.BooleanVar(value=False)
+            tk.Checkbutton(self.root, text="Save all reports in one ZIP archive, with a manifest CSV",
+                           variable=self.single_archive).pack(padx=20, anchor="w")
+            
+            # Keep regenerating changed reports until Cancel is pressed
+            self.watch_changes = tk.BooleanVar(value=False)
+            tk.Checkbutton(self.root, text="Keep watching for changes and regenerate affected reports",
+                           variable=self.watch_changes).pack(padx=20, anchor="w")
+            
+            # Generate and Cancel buttons
+            button_frame = tk.Frame(self.root)
+            button_frame.pack(pady=20)
+            self.generate_button = tk.Button(button_frame, text="Generate Reports", command=self.generate_reports,
+                                             bg="#4CAF50", fg="white", font=("Arial", 12, "bold"), 
+                                             padx=20, pady=10)
+            self.generate_button.pack(side=tk.LEFT, padx=5)
+            self.cancel_button = tk.Button(button_frame, text="Cancel", command=self.cancel_generation,
+                                           font=("Arial", 12), padx=20, pady=10, state=tk.DISABLED)
+            self.cancel_button.pack(side=tk.LEFT, padx=5)
+            
+            # Progress bar
+            self.progress_bar = ttk.Progressbar(self.root, orient=tk.HORIZONTAL, length=500, mode='determinate')
+            self.progress_bar.pack(pady=5)
+            
+            # Status label
+            self.status_label = tk.Label(self.root, text="Ready to generate reports", 
+                                        fg="green", font=("Arial", 10))
+            self.status_label.pack(pady=10)
             
-            # Add camera icon
-            draw.ellipse([(width//2-40, height//1.7-40), (width//2+40, height//1.7+40)], 
-                         outline=(180, 180, 180), width=3)
-            draw.line([(width//2-25, height//1.7-25), (width//2+25, height//1.7+25)], 
-                      fill=(180, 180, 180), width=3)
-            draw.line([(width//2-25, height//1.7+25), (width//2+25, height//1.7-25)], 
-                      fill=(180, 180, 180), width=3)
+            # Throughput and ETA
+            self.rate_label = tk.Label(self.root, text="", fg="gray", font=("Arial", 9))
+            self.rate_label.pack()
             
-            # Save to temporary file
-            temp_file = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-            img.save(temp_file.name)
-            temp_file.close()
+            # Instance variables
+            self.input_file_path = ""
+            self.images_folder_path = ""
+            self.output_folder_path = ""
+            self.worker_thread = None
+            self.progress_queue = queue.Queue()
+            self.cancel_event = threading.Event()
+            self.batch_started = None
             
-            # Add to cache
-            self.placeholder_cache[cache_key] = temp_file.name
-            return temp_file.name
+            logging.info("GUI initialized")
+            self.root.after_idle(self.window_ready)
+            self.root.mainloop()
         except Exception as e:
-            logging.error(f"Error creating placeholder: {str(e)}")
-            return None
+            logging.exception("Error during initialization")
+            messagebox.showerror("Critical Error", f"Initialization failed: {str(e)}\nSee log file for details.")
+    
+    def window_ready(self):
+        """First idle moment after the window is shown: record startup time, then warm up imports"""
+        logging.info(f"Window ready {time.perf_counter() - STARTED_AT:.2f}s after start")
+        if WARM_UP_IMPORTS:
+            threading.Thread(target=warm_up_imports, daemon=True).start()
+    
+    def select_input_file(self):
+        try:
+            file_path = filedialog.askopenfilename(
+                filetypes=[("Excel/CSV Files", "*.xlsx *.csv"), ("All Files", "*.*")]
+            )
+            if file_path:
+                self.input_file_path = file_path
+                self.input_file_label.config(text=os.path.basename(file_path))
+                self.status_label.config(text="Input file selected", fg="blue")
+        except Exception as e:
+            logging.exception("Error selecting input file")
+            messagebox.showerror("Error", f"Error selecting input file: {str(e)}")
+    
+    def select_images_folder(self):
+        try:
+            folder_path = filedialog.askdirectory()
+            if folder_path:
+                self.images_folder_path = folder_path
+                self.images_folder_label.config(text=os.path.basename(folder_path))
+                self.status_label.config(text="Images folder selected", fg="blue")
+        except Exception as e:
+            logging.exception("Error selecting images folder")
+            messagebox.showerror("Error", f"Error selecting images folder: {str(e)}")
+    
+    def select_output_folder(self):
+        try:
+            folder_path = filedialog.askdirectory()
+            if folder_path:
+                self.output_folder_path = folder_path
+                self.output_folder_label.config(text=os.path.basename(folder_path))
+                self.status_label.config(text="Output folder selected", fg="blue")
+        except Exception as e:
+            logging.exception("Error selecting output folder")
+            messagebox.showerror("Error", f"Error selecting output folder: {str(e)}")
+    
+    def generate_reports(self):
+        try:
+            if not all([self.input_file_path, self.images_folder_path, self.output_folder_path]):
+                messagebox.showerror("Error", "Please select all required files and folders")
+                return
+            if self.worker_thread and self.worker_thread.is_alive():
+                return
+            if self.single_archive.get() and self.watch_changes.get():
+                messagebox.showerror("Error", "Watching for changes updates the reports in the output folder;"
+                                              " untick one of the two options")
+                return
+            
+            archive_path = None
+            if self.single_archive.get():
+                archive_path = os.path.join(self.output_folder_path,
+                                            f"FIRST INSPECTION REPORTS {time.strftime('%Y-%m-%d %H%M%S')}.zip")
+            self.cancel_event.clear()
+            self.progress_queue = queue.Queue()
+            self.batch_started = time.monotonic()
+            self.progress_bar.stop()
+            self.progress_bar.config(mode='determinate', value=0, maximum=1)
+            self.generate_button.config(state=tk.DISABLED)
+            self.cancel_button.config(state=tk.NORMAL)
+            self.status_label.config(text="Processing...", fg="orange")
+            self.rate_label.config(text="")
+            
+            # Generation runs on a worker thread; the GUI only hears from it through the queue
+            self.worker_thread = threading.Thread(
+                target=self.run_batch,
+                args=(self.input_file_path, self.images_folder_path, self.output_folder_path,
+                      self.skip_unchanged.get(), self.per_claim_folders.get(), self.watch_changes.get(),
+                      archive_path, self.progress_queue),
+                daemon=True
+            )
+            self.worker_thread.start()
+            self.root.after(PROGRESS_POLL_MS, self.poll_progress)
+        except Exception as e:
+            logging.exception("Error generating reports")
+            self.status_label.config(text="Error - see log", fg="red")
+            messagebox.showerror("Error", f"An error occurred: {str(e)}\nSee log file for details.")
+    
+    def run_batch(self, input_file_path, images_folder_path, output_folder_path, incremental, per_claim_folders,
+                  watch, archive_path, progress_queue):
+        """Worker thread body - must not touch any Tk widget"""
+        try:
+            engine = ReportEngine(images_folder_path, output_folder_path, per_claim_folders=per_claim_folders)
+            progress_callback = lambda done, total_count, result: progress_queue.put(('progress', done, total_count, result))
+            if watch:
+                # Runs until Cancel; the GUI hears about every pass through the queue
+                results = ClaimWatcher(
+                    engine, input_file_path,
+                    progress_callback=progress_callback,
+                    cancel_event=self.cancel_event,
+                    incremental=incremental,
+                    pass_started=lambda count: progress_queue.put(('pass_started', count)),
+                    pass_finished=lambda results: progress_queue.put(('watching', results))
+                ).run()
+                progress_queue.put(('finished', results, len(engine.bad_photos), True))
+                return
+            results = engine.generate_reports(
+                input_file_path,
+                progress_callback=progress_callback,
+                cancel_event=self.cancel_event,
+                incremental=incremental,
+                archive_path=archive_path
+            )
+            for line in engine.batch_metrics.summary_lines():
+                logging.info(line)
+            progress_queue.put(('finished', results, len(engine.bad_photos), False, archive_path))
+        except Exception as e:
+            logging.exception("Error generating reports")
+            progress_queue.put(('error', str(e)))
+    
+    def poll_progress(self):
+        """Drain progress events from the worker thread, then check again shortly"""
+        try:
+            while True:
+                event = self.progress_queue.get_nowait()
+                if event[0] == 'progress':
+                    self.show_progress(*event[1:])
+                elif event[0] == 'pass_started':
+                    self.batch_started = time.monotonic()
+                    self.progress_bar.config(mode='determinate', value=0, maximum=max(event[1], 1))
+                    self.status_label.config(text=f"Change detected - regenerating {event[1]} reports", fg="orange")
+                elif event[0] == 'watching':
+                    self.show_watching(*event[1:])
+                elif event[0] == 'finished':
+                    self.finish_generation(*event[1:])
+                    return
+                elif event[0] == 'error':
+                    self.reset_controls()
+                    self.status_label.config(text="Error - see log", fg="red")
+                    messagebox.showerror("Error", f"An error occurred: {event[1]}\nSee log file for details.")
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(PROGRESS_POLL_MS, self.poll_progress)
+    
+    def show_progress(self, done, total_count, result):
+        elapsed = time.monotonic() - self.batch_started
+        rate = done / elapsed if elapsed > 0 else 0
+        rate_text = f"{rate * 60:.1f} reports/min"
+        
+        if total_count:
+            self.progress_bar.config(maximum=total_count, value=min(done, total_count))
+            if rate > 0 and total_count > done:
+                rate_text += f" - ETA {format_duration((total_count - done) / rate)}"
+        else:
+            # Row count unknown (e.g. CSV input) - just show activity
+            if str(self.progress_bar.cget('mode')) != 'indeterminate':
+                self.progress_bar.config(mode='indeterminate')
+                self.progress_bar.start(20)
+        
+        if not self.cancel_event.is_set():
+            self.status_label.config(text=f"Processing {done}/{total_count or '?'}: {result.claim}", fg="orange")
+        self.rate_label.config(text=rate_text)
+    
+    def show_watching(self, results):
+        success_count = sum(1 for result in results if result.status == 'success')
+        failed_count = sum(1 for result in results if result.status == 'failed')
+        failed_text = f", {failed_count} failed" if failed_count else ""
+        self.progress_bar.stop()
+        self.progress_bar.config(mode='determinate', maximum=max(len(results), 1), value=len(results))
+        self.status_label.config(text=f"Watching for changes - {time.strftime('%H:%M:%S')}: "
+                                      f"regenerated {success_count} reports{failed_text}", fg="green")
+        self.rate_label.config(text="Press Cancel to stop watching")
+    
+    def cancel_generation(self):
+        self.cancel_event.set()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.status_label.config(text="Cancelling after the current claim...", fg="orange")
+    
+    def reset_controls(self):
+        self.progress_bar.stop()
+        self.progress_bar.config(mode='determinate')
+        self.generate_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+    
+    def finish_generation(self, results, bad_photo_count=0, watched=False, archive_path=None):
+        self.reset_controls()
+        if watched:
+            success_count = sum(1 for result in results if result.status == 'success')
+            self.status_label.config(text=f"Stopped watching - regenerated {success_count} reports", fg="blue")
+            self.rate_label.config(text="")
+            return
+        success_count = sum(1 for result in results if result.status == 'success')
+        skipped_count = sum(1 for result in results if result.status == 'skipped')
+        total_count = len(results)
+        skipped_text = f", {skipped_count} unchanged reports skipped" if skipped_count else ""
+        if archive_path and self.cancel_event.is_set():
+            skipped_text += (f"\n\nNo archive was saved for the cancelled batch - the reports built so far are"
+                             f" listed in {os.path.basename(archive_manifest_path(archive_path, complete=False))}")
+        elif archive_path:
+            skipped_text += f"\n\nReports saved in {os.path.basename(archive_path)}"
+        if bad_photo_count:
+            skipped_text += f"\n\n{bad_photo_count} unreadable photos were left out - see {BAD_PHOTOS_REPORT_NAME} in the output folder"
+        elapsed = time.monotonic() - self.batch_started
+        self.progress_bar.config(maximum=max(total_count, 1), value=total_count)
+        self.rate_label.config(text=f"{total_count} claims in {format_duration(elapsed)}")
+        
+        if self.cancel_event.is_set():
+            self.status_label.config(text=f"Cancelled - generated {success_count}/{total_count} reports", fg="blue")
+            messagebox.showinfo("Cancelled", f"Batch cancelled. Generated {success_count} out of {total_count} reports processed{skipped_text}")
+        else:
+            self.status_label.config(text=f"Generated {success_count}/{total_count} reports", fg="green")
+            messagebox.showinfo("Success", f"Successfully generated {success_count} out of {total_count} reports{skipped_text}")
+
+def run_headless(argv=None):
+    """Command-line entry point: generate every report without opening the GUI"""
+    parser = argparse.ArgumentParser(description="Generate First Inspection Reports without the GUI")
+    parser.add_argument('input_file', help="Input CSV/Excel file with claim data")
+    parser.add_argument('images_folder', help="Folder with room folders and header/footer images")
+    parser.add_argument('output_folder', help="Folder where the Word reports are saved")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument('--image-dpi', type=int, default=200,
+                        help="Resolution photos are downscaled to for their slot in the report (default: 200)")
+    parser.add_argument('--image-cache', default=DEFAULT_IMAGE_CACHE_DIR,
+                        help="Folder for prepared images shared across reports and runs")
+    parser.add_argument('--placeholder-cache', default=DEFAULT_PLACEHOLDER_CACHE_DIR,
+                        help="Folder that keeps rendered placeholder images between runs (empty to disable)")
+    parser.add_argument('--backend', choices=['docx', 'ooxml'], default='docx',
+                        help="Build reports through python-docx (default) or write the OOXML package directly")
+    parser.add_argument('--force', action='store_true',
+                        help="Regenerate every report, even if its claim data and photos are unchanged")
+    parser.add_argument('--store-media', action='store_true',
+                        help="Store the already-compressed photos in each .docx without deflating them again (faster saves)")
+    parser.add_argument('--deflate-level', type=int, choices=range(10), metavar='0-9',
+                        help="zlib compression level for the XML parts of each .docx (default: zlib's default, 6)")
+    parser.add_argument('--compare-packaging', action='store_true',
+                        help="Package the first few reports with each packaging choice and print time and size, then exit")
+    parser.add_argument('--strict-photos', action='store_true',
+                        help="Stop before building any report if a photo fails validation (default: leave it out)")
+    parser.add_argument('--per-claim-folders', action='store_true',
+                        help="images_folder holds one photo folder per claim, named after its CLAIM #")
+    parser.add_argument('--archive', metavar='NAME.zip',
+                        help="Stream every report into this one ZIP in the output folder, with a manifest CSV, "
+                             "instead of writing separate .docx files")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and regenerate the reports whose claim row or photos change (Ctrl+C to stop)")
+    parser.add_argument('--poll-interval', type=float, default=WATCH_POLL_SECONDS, metavar='SECONDS',
+                        help=f"How often --watch checks the input file and images folder (default: {WATCH_POLL_SECONDS:g})")
+    parser.add_argument('--settle', type=float, default=WATCH_SETTLE_SECONDS, metavar='SECONDS',
+                        help=f"How long changes must stop before --watch regenerates (default: {WATCH_SETTLE_SECONDS:g})")
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], type=str.upper,
+                        default=DEFAULT_LOG_LEVEL,
+                        help=f"Least severe records written to {LOG_FILE_NAME}; DEBUG adds every claim's stage timings "
+                             f"(default: {DEFAULT_LOG_LEVEL})")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="Write per-claim stage timings and counters to PATH (.csv for CSV, otherwise JSON)")
+    parser.add_argument('--profile', metavar='CLAIM',
+                        help="Generate only the given CLAIM # under cProfile and print the hottest functions")
+    parser.add_argument('--profile-output', metavar='PATH',
+                        help="Where to save the cProfile stats (default: profile_<CLAIM>.prof in the output folder)")
+    args = parser.parse_args(argv)
+    if args.archive and args.watch:
+        parser.error("--archive can't be combined with --watch")
+    logging.getLogger().setLevel(args.log_level)
+    
+    os.makedirs(args.output_folder, exist_ok=True)
+    engine = ReportEngine(args.images_folder, args.output_folder,
+                          image_cache_dir=args.image_cache, image_dpi=args.image_dpi,
+                          placeholder_cache_dir=args.placeholder_cache or None, backend=args.backend,
+                          per_claim_folders=args.per_claim_folders,
+                          packaging=PackagingOptions(args.store_media, args.deflate_level))
+    
+    if args.compare_packaging:
+        comparison = engine.compare_packaging(args.input_file)
+        baseline = comparison[0]
+        print(f"Packaging {baseline['reports']} reports:")
+        for row in comparison:
+            print(f"  {row['packaging']:<30}{row['seconds']:>8.3f}s  {row['bytes'] / 1e6:>8.2f} MB"
+                  f"  ({(row['bytes'] - baseline['bytes']) / max(baseline['bytes'], 1) * 100:+.1f}% size,"
+                  f" {(row['seconds'] - baseline['seconds']) / max(baseline['seconds'], 1e-9) * 100:+.1f}% time)")
+        return 0
+    
+    if args.profile:
+        stats_path = args.profile_output or os.path.join(
+            args.output_folder, f"profile_{re.sub(r'[^A-Za-z0-9_-]', '_', args.profile)}.prof")
+        try:
+            result, stats = engine.profile_claim(args.input_file, args.profile, stats_path)
+        except ValueError as e:
+            print(e)
+            return 1
+        stats.sort_stats('cumulative').print_stats(25)
+        print(f"{result.claim}: {result.status}, profile saved to {stats_path}")
+        return 1 if result.status == 'failed' else 0
+    
+    def print_progress(done, total_count, result):
+        if result.status == 'success':
+            print(f"[{done}/{total_count or '?'}] {result.claim}: saved {os.path.basename(result.path)}")
+        elif result.status == 'skipped':
+            print(f"[{done}/{total_count or '?'}] {result.claim}: unchanged, skipped")
+        else:
+            print(f"[{done}/{total_count or '?'}] {result.claim}: FAILED - {result.error}")
+    
+    if args.watch:
+        def print_pass(results):
+            saved = sum(1 for result in results if result.status == 'success')
+            failed_count = sum(1 for result in results if result.status == 'failed')
+            print(f"Regenerated {saved} reports, {failed_count} failed; watching for changes...")
+        
+        watcher = ClaimWatcher(engine, args.input_file, workers=args.workers, progress_callback=print_progress,
+                               incremental=not args.force, strict_photos=args.strict_photos,
+                               poll_seconds=args.poll_interval, settle_seconds=args.settle,
+                               pass_finished=print_pass)
+        print(f"Watching {args.input_file} and {args.images_folder} for changes (Ctrl+C to stop)")
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            print("Stopped watching")
+        return 0
+    
+    try:
+        archive_path = os.path.join(args.output_folder, args.archive) if args.archive else None
+        results = engine.generate_reports(args.input_file, workers=args.workers, progress_callback=print_progress,
+                                          incremental=not args.force, strict_photos=args.strict_photos,
+                                          archive_path=archive_path)
+    except PhotoValidationError as e:
+        print(f"Stopped: {e}")
+        for check in sorted(e.bad_photos.values()):
+            print(f"  {check.path}: {check.error}")
+        return 1
+    
+    if engine.bad_photos:
+        print(f"{len(engine.bad_photos)} unreadable photos were left out, listed in "
+              f"{os.path.join(args.output_folder, BAD_PHOTOS_REPORT_NAME)}")
+    failed = [result for result in results if result.status == 'failed']
+    skipped = [result for result in results if result.status == 'skipped']
+    print(f"Generated {len(results) - len(failed) - len(skipped)}/{len(results)} reports, "
+          f"{len(skipped)} unchanged reports skipped")
+    for result in failed:
+        print(f"  row {result.index} ({result.claim}): {result.error}")
+    if archive_path:
+        print(f"Reports archived in {archive_path}, listed in {archive_manifest_path(archive_path)}")
+    print('\n'.join(engine.batch_metrics.summary_lines()))
+    if args.metrics:
+        engine.batch_metrics.export(args.metrics)
+        print(f"Metrics written to {args.metrics}")
+    return 1 if failed else 0
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Needed for the process pool in the PyInstaller EXE
+    if len(sys.argv) > 1:
+        configure_logging()
+        sys.exit(run_headless())
     try:
         configure_logging()
         ReportGenerator()
@@ -0,0 +1,350 @@
+"""Benchmark ReportGenerator on synthetic claim workbooks and photo trees
+
+Generates a workbook shaped like data1.xlsx and a photo tree shaped like photos/,
+then times each stage of report generation as well as complete batches, and
+writes the results to a JSON file so runs can be compared across commits.
+
+    python benchmark.py --rows 200 --rooms 5 --photos 4 --resolution 1600x1200 -o bench.json
+"""
+import os
+import sys
+import argparse
+import json
+import random
+import shutil
+import statistics
+import subprocess
+import platform
+import tempfile
+import time
+import multiprocessing
+from datetime import date, timedelta
+import openpyxl
+from PIL import Image, ImageDraw
+
+from ReportGenerator import ReportEngine, PhotoIndex, iter_claims
+
+CLAIM_COLUMNS = [
+    'INSURED/POLICYHOLDER', 'ADDRESS', 'INSURER', 'CLAIM #', 'ADJUSTER/ CLAIM REP',
+    'DATE OF INSPECTION', 'DATE OF LOSS', 'DATE OF REPORT', 'TYPE OF LOSS',
+    'CAUSE OF LOSS', 'SCOPE OF WORK',
+]
+FIRST_NAMES = ['ABIGAIL', 'MICHAEL', 'PRIYA', 'OMAR', 'EMILY', 'JORDAN', 'ANITA', 'LUCAS', 'SANDRA', 'KEVIN']
+LAST_NAMES = ['CARTER', 'NGUYEN', 'PATEL', 'HASSAN', 'WILSON', 'LEE', 'SINGH', 'MARTIN', 'BROWN', 'CHEN']
+CITIES = ['SCARBOROUGH', 'MISSISSAUGA', 'BRAMPTON', 'ETOBICOKE', 'NORTH YORK', 'OAKVILLE', 'TORONTO', 'VAUGHAN']
+LOSS_TYPES = {
+    'WATER DAMAGE': "The loss was caused by a burst pipe on the second floor which led to flooding in multiple rooms.",
+    'FIRE DAMAGE': "A kitchen fire spread to the adjoining rooms, leaving smoke and soot damage throughout the main floor.",
+    'WIND DAMAGE': "High winds lifted shingles from the roof, allowing rain to enter the attic and upper bedrooms.",
+    'SEWER BACKUP': "Heavy rainfall overwhelmed the municipal sewer, causing a backup through the basement floor drain.",
+}
+SCOPE_STEPS = [
+    "Assess and document all damaged areas.", "Extract standing water.", "Dry and dehumidify structure.",
+    "Remove and dispose of damaged drywall.", "Clean and deodorize affected contents.",
+    "Restore affected areas.", "Dispose of irreparable materials.",
+]
+ROOM_NAMES = ['kitchen', 'living', 'bedroom1', 'bedroom2', 'storage', 'bathroom', 'basement', 'dining', 'hallway', 'garage']
+STAGES = ['parse', 'scan', 'image_prepare', 'template', 'build', 'embed', 'save']
+
+def write_claims_workbook(path, rows, seed):
+    """Write a claim workbook with the same columns and cell shapes as data1.xlsx"""
+    rng = random.Random(seed)
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(CLAIM_COLUMNS)
+    for row in range(rows):
+        loss_type = rng.choice(list(LOSS_TYPES))
+        loss_date = date(2025, 1, 1) + timedelta(days=rng.randrange(300))
+        inspection_date = loss_date + timedelta(days=rng.randrange(1, 7))
+        report_date = inspection_date + timedelta(days=rng.randrange(1, 7))
+        postal_code = f"L{rng.randrange(10)}{chr(65 + rng.randrange(26))} {rng.randrange(10)}{chr(65 + rng.randrange(26))}{rng.randrange(10)}"
+        steps = rng.sample(SCOPE_STEPS, rng.randrange(3, len(SCOPE_STEPS) + 1))
+        sheet.append([
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            f"{rng.choice(CITIES)}, ON {postal_code}",
+            'ABC INSURANCE',
+            f"PR{1000 + row}",
+            'NOVA CLAIMS',
+            inspection_date.strftime('%B %d, %Y').upper(),
+            loss_date.strftime('%B %d, %Y').upper(),
+            report_date.strftime('%B %d, %Y').upper(),
+            loss_type,
+            LOSS_TYPES[loss_type],
+            '\n'.join(f"{number}. {step}" for number, step in enumerate(steps, 1)),
+        ])
+    workbook.save(path)
+
+def synthetic_photo(rng, size):
+    """Random shapes over sensor-like noise, so JPEG sizes are close to real photos"""
+    image = Image.new('RGB', size, tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    width, height = size
+    for _ in range(30):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = x0 + rng.randrange(width // 2 + 1), y0 + rng.randrange(height // 2 + 1)
+        fill = tuple(rng.randrange(256) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.rectangle([x0, y0, x1, y1], fill=fill)
+        else:
+            draw.ellipse([x0, y0, x1, y1], fill=fill)
+    noise = Image.effect_noise(size, 24).convert('RGB')
+    return Image.blend(image, noise, 0.15)
+
+def write_photo_tree(folder, rooms, photos_per_room, resolution, seed):
+    """Write a photo tree laid out like photos/: banners and front photo at the root, one folder per room"""
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    banner_size = (resolution[0], max(1, resolution[0] // 8))
+    synthetic_photo(rng, banner_size).save(os.path.join(folder, 'header.png'))
+    synthetic_photo(rng, banner_size).save(os.path.join(folder, 'footer.png'))
+    synthetic_photo(rng, resolution).save(os.path.join(folder, 'front_house.jpg'), quality=90)
+
+    picture_number = 2
+    for room in range(rooms):
+        room_name = ROOM_NAMES[room] if room < len(ROOM_NAMES) else f"room{room + 1}"
+        room_folder = os.path.join(folder, room_name)
+        os.makedirs(room_folder, exist_ok=True)
+        for _ in range(photos_per_room):
+            synthetic_photo(rng, resolution).save(os.path.join(room_folder, f"Picture{picture_number}.jpg"), quality=90)
+            picture_number += 1
+
+def prepare_inputs(workdir, args):
+    """Generate (or reuse) the workbook and photo tree for these parameters"""
+    width, height = args.resolution
+    workbook_path = os.path.join(workdir, f"claims_{args.rows}_seed{args.seed}.xlsx")
+    photos_folder = os.path.join(workdir, f"photos_{args.rooms}x{args.photos}_{width}x{height}_seed{args.seed}")
+    if not os.path.exists(workbook_path):
+        write_claims_workbook(workbook_path, args.rows, args.seed)
+    if not os.path.isdir(photos_folder):
+        write_photo_tree(photos_folder, args.rooms, args.photos, args.resolution, args.seed)
+    return workbook_path, photos_folder
+
+class StageTimer:
+    def __init__(self):
+        self.totals = dict.fromkeys(STAGES, 0.0)
+
+    def add(self, stage, seconds):
+        self.totals[stage] += seconds
+
+    def wrap(self, obj, method_name, stage):
+        """Time every call to obj.method_name under the given stage"""
+        method = getattr(obj, method_name)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        setattr(obj, method_name, timed)
+
+def run_stages(workbook_path, photos_folder, scratch, backend):
+    """Run one serial batch step by step, timing each stage on its own with cold caches"""
+    timer = StageTimer()
+    output_folder = os.path.join(scratch, 'output')
+    os.makedirs(output_folder)
+
+    start = time.perf_counter()
+    claims = [claim for _, claim in iter_claims(workbook_path)]
+    timer.add('parse', time.perf_counter() - start)
+
+    start = time.perf_counter()
+    photo_index = PhotoIndex(photos_folder)
+    timer.add('scan', time.perf_counter() - start)
+
+    engine = ReportEngine(photos_folder, output_folder, photo_index=photo_index, backend=backend,
+                          image_cache_dir=os.path.join(scratch, 'image_cache'),
+                          placeholder_cache_dir=os.path.join(scratch, 'placeholder_cache'))
+    start = time.perf_counter()
+    engine.prepare_images()
+    timer.add('image_prepare', time.perf_counter() - start)
+
+    start = time.perf_counter()
+    engine.get_template()
+    timer.add('template', time.perf_counter() - start)
+
+    # Photo sections count as embedding; the rest of build_report is document build
+    timer.wrap(engine, 'add_front_photo', 'embed')
+    timer.wrap(engine, 'add_room_photos_from_folders', 'embed')
+    bytes_written = 0
+    for claim in claims:
+        embed_before = timer.totals['embed']
+        start = time.perf_counter()
+        doc = engine.build_report(claim)
+        timer.add('build', time.perf_counter() - start - (timer.totals['embed'] - embed_before))
+
+        save_path = os.path.join(output_folder, engine.build_report_filename(claim))
+        start = time.perf_counter()
+        doc.save(save_path)
+        timer.add('save', time.perf_counter() - start)
+        bytes_written += os.path.getsize(save_path)
+
+    return timer.totals, len(claims), bytes_written
+
+def run_end_to_end(workbook_path, photos_folder, scratch, backend, workers):
+    """Time a full batch through ReportEngine.generate_reports with cold caches"""
+    output_folder = os.path.join(scratch, 'output')
+    os.makedirs(output_folder)
+    start = time.perf_counter()
+    engine = ReportEngine(photos_folder, output_folder, backend=backend,
+                          image_cache_dir=os.path.join(scratch, 'image_cache'),
+                          placeholder_cache_dir=os.path.join(scratch, 'placeholder_cache'))
+    results = engine.generate_reports(workbook_path, workers=workers, incremental=False)
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for result in results if result.status == 'failed')
+    return elapsed, len(results), failed
+
+STARTUP_SCRIPT = '''
+import sys, time, json
+started = time.perf_counter()
+import ReportGenerator
+imported = time.perf_counter()
+ReportGenerator.warm_up_imports()
+print(json.dumps({'import': imported - started, 'warm_up': time.perf_counter() - imported}))
+'''
+
+def measure_startup(runs):
+    """Cold import of ReportGenerator (what the window waits for) and of the lazily loaded libraries"""
+    samples = {'import': [], 'warm_up': []}
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        for name, seconds in json.loads(output.splitlines()[-1]).items():
+            samples[name].append(seconds)
+    return samples
+
+def compare_packaging(workbook_path, photos_folder, scratch, backend, sample):
+    """Serialize time and size of the first reports under each packaging choice"""
+    engine = ReportEngine(photos_folder, scratch, backend=backend,
+                          image_cache_dir=os.path.join(scratch, 'image_cache'),
+                          placeholder_cache_dir=os.path.join(scratch, 'placeholder_cache'))
+    return engine.compare_packaging(workbook_path, sample=sample)
+
+def summarize(samples):
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'max': max(samples),
+        'samples': samples,
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_resolution(value):
+    try:
+        width, height = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+    return width, height
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark report generation on synthetic claims and photos")
+    parser.add_argument('--rows', type=int, default=100, help="Number of claim rows in the workbook (default: 100)")
+    parser.add_argument('--rooms', type=int, default=5, help="Number of room folders (default: 5)")
+    parser.add_argument('--photos', type=int, default=4, help="Images per room folder (default: 4)")
+    parser.add_argument('--resolution', type=parse_resolution, default=(1600, 1200),
+                        help="Size of the synthetic photos as WIDTHxHEIGHT (default: 1600x1200)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic data (default: 0)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed repetitions of each run (default: 3)")
+    parser.add_argument('--startup-runs', type=int, default=5,
+                        help="Fresh interpreters used to time the module import (default: 5, 0 to skip)")
+    parser.add_argument('--packaging-sample', type=int, default=5,
+                        help="Reports packaged with each packaging choice for comparison (default: 5, 0 to skip)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for the end-to-end run (default: all CPU cores)")
+    parser.add_argument('--backend', choices=['docx', 'ooxml'], default='docx', help="Document backend (default: docx)")
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'ReportGeneratorBenchmark'),
+                        help="Folder for the generated inputs, reused between runs with the same parameters")
+    parser.add_argument('-o', '--output', default='benchmark.json', help="JSON results file (default: benchmark.json)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    start = time.perf_counter()
+    workbook_path, photos_folder = prepare_inputs(args.workdir, args)
+    print(f"Inputs ready in {time.perf_counter() - start:.1f}s: {workbook_path}, {photos_folder}")
+
+    stage_samples = {stage: [] for stage in STAGES}
+    serial_samples = []
+    end_to_end_samples = []
+    claim_count = bytes_written = failed = 0
+    for repeat in range(args.repeat):
+        scratch = tempfile.mkdtemp(prefix='run_', dir=args.workdir)
+        try:
+            totals, claim_count, bytes_written = run_stages(workbook_path, photos_folder, scratch, args.backend)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        for stage in STAGES:
+            stage_samples[stage].append(totals[stage])
+        serial_samples.append(sum(totals.values()))
+
+        scratch = tempfile.mkdtemp(prefix='run_', dir=args.workdir)
+        try:
+            elapsed, _, failed = run_end_to_end(workbook_path, photos_folder, scratch, args.backend, args.workers)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        end_to_end_samples.append(elapsed)
+        print(f"Run {repeat + 1}/{args.repeat}: stages {serial_samples[-1]:.2f}s serial, "
+              f"end-to-end {elapsed:.2f}s with {args.workers} worker(s)")
+
+    startup = measure_startup(args.startup_runs) if args.startup_runs > 0 else None
+    packaging = None
+    if args.packaging_sample > 0:
+        scratch = tempfile.mkdtemp(prefix='run_', dir=args.workdir)
+        try:
+            packaging = compare_packaging(workbook_path, photos_folder, scratch, args.backend, args.packaging_sample)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+    
+    results = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'parameters': {
+            'rows': args.rows,
+            'rooms': args.rooms,
+            'photos_per_room': args.photos,
+            'resolution': list(args.resolution),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'workers': args.workers,
+            'backend': args.backend,
+        },
+        'claims': claim_count,
+        'failed': failed,
+        'bytes_written': bytes_written,
+        'stages': {stage: summarize(samples) for stage, samples in stage_samples.items()},
+        'serial_total': summarize(serial_samples),
+        'end_to_end': summarize(end_to_end_samples),
+        'claims_per_second': claim_count / min(end_to_end_samples) if claim_count else 0.0,
+        'startup': {name: summarize(samples) for name, samples in startup.items()} if startup else None,
+        'packaging': packaging,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n{'Stage':<15}{'median':>10}{'per claim':>12}")
+    for stage in STAGES:
+        median = results['stages'][stage]['median']
+        print(f"{stage:<15}{median:>9.3f}s{median / max(claim_count, 1) * 1000:>10.2f}ms")
+    print(f"{'end-to-end':<15}{results['end_to_end']['median']:>9.3f}s"
+          f"  ({results['claims_per_second']:.1f} claims/s, {args.workers} worker(s))")
+    if startup:
+        print(f"{'import':<15}{results['startup']['import']['median']:>9.3f}s  (window can open)")
+        print(f"{'warm-up':<15}{results['startup']['warm_up']['median']:>9.3f}s  (pandas, python-docx, PIL, lxml)")
+    if packaging:
+        print(f"\nPackaging {packaging[0]['reports']} reports:")
+        for row in packaging:
+            print(f"  {row['packaging']:<30}{row['seconds']:>8.3f}s  {row['bytes'] / 1e6:>8.2f} MB")
+    print(f"Results written to {args.output}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# ReportGenerator.py is a script, not an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ReportGenerator import ReportEngine
+
+# Sample claims and photos at the repo root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+INPUT_FILE = os.path.join(REPO_ROOT, 'data1.xlsx')
+IMAGES_FOLDER = os.path.join(REPO_ROOT, 'photos')
+
+needs_sample_data = pytest.mark.skipif(not (os.path.exists(INPUT_FILE) and os.path.isdir(IMAGES_FOLDER)),
+                                       reason="sample data1.xlsx and photos/ not available")
+
+def make_engine(tmp_path, output_folder=None, images_folder=IMAGES_FOLDER, **options):
+    """ReportEngine writing to output_folder (default tmp_path), with its caches in tmp_path"""
+    return ReportEngine(str(images_folder), str(output_folder or tmp_path),
+                        image_cache_dir=str(tmp_path / 'image_cache'),
+                        placeholder_cache_dir=str(tmp_path / 'placeholder_cache'), **options)
+
+@pytest.fixture
+def engine(tmp_path):
+    return make_engine(tmp_path)
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""Batch archives are only published when the whole batch ran"""
+import csv
+import os
+import threading
+import zipfile
+
+import pytest
+
+from ReportGenerator import archive_manifest_path
+from conftest import INPUT_FILE, needs_sample_data
+
+pytestmark = needs_sample_data
+
+def read_manifest(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+def test_complete_batch(engine, tmp_path):
+    archive_path = str(tmp_path / 'batch.zip')
+    results = engine.generate_reports(INPUT_FILE, archive_path=archive_path)
+    rows = read_manifest(archive_manifest_path(archive_path))
+    assert [row['claim'] for row in rows] == [result.claim for result in results]
+    assert all(row['status'] == 'success' for row in rows)
+    with zipfile.ZipFile(archive_path) as archive:
+        assert sorted(archive.namelist()) == sorted([row['filename'] for row in rows] + ['manifest.csv'])
+        assert all(archive.getinfo(row['filename']).file_size == int(row['size']) for row in rows)
+    assert not any(name.endswith('.tmp') for name in os.listdir(tmp_path))
+
+def test_failed_batch_is_not_published(engine, tmp_path):
+    read_claims = engine.read_claims
+    
+    def failing_claims(input_file_path):
+        for count, claim in enumerate(read_claims(input_file_path)):
+            if count == 3:
+                raise OSError("input file went away")
+            yield claim
+    
+    engine.read_claims = failing_claims
+    archive_path = str(tmp_path / 'batch.zip')
+    with pytest.raises(OSError):
+        engine.generate_reports(INPUT_FILE, archive_path=archive_path)
+    assert not os.path.exists(archive_path)
+    assert not os.path.exists(archive_manifest_path(archive_path))
+    rows = read_manifest(archive_manifest_path(archive_path, complete=False))
+    assert [row['status'] for row in rows] == ['success'] * 3 + ['incomplete']
+    assert 'input file went away' in rows[-1]['error']
+    assert not any(name.endswith('.tmp') for name in os.listdir(tmp_path))
+
+def test_cancelled_batch_is_not_published(engine, tmp_path):
+    cancel_event = threading.Event()
+    archive_path = str(tmp_path / 'batch.zip')
+    
+    def cancel_after_first(done, total_count, result):
+        cancel_event.set()
+    
+    engine.generate_reports(INPUT_FILE, progress_callback=cancel_after_first,
+                            cancel_event=cancel_event, archive_path=archive_path)
+    assert not os.path.exists(archive_path)
+    rows = read_manifest(archive_manifest_path(archive_path, complete=False))
+    assert rows[-1]['status'] == 'incomplete' and rows[-1]['error'] == 'batch cancelled'
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""The python-docx and direct OOXML backends must produce equivalent reports"""
+import os
+import zipfile
+
+import pytest
+from docx import Document
+from lxml import etree
+
+from conftest import INPUT_FILE, make_engine, needs_sample_data
+
+pytestmark = needs_sample_data
+
+def generate(backend, tmp_path):
+    output_folder = tmp_path / backend
+    output_folder.mkdir()
+    engine = make_engine(tmp_path, output_folder, backend=backend)
+    results = engine.generate_reports(INPUT_FILE, incremental=False)
+    assert results and all(result.status == 'success' for result in results)
+    return output_folder
+
+def canonical_xml(data):
+    return etree.tostring(etree.fromstring(data), method='c14n')
+
+def document_text(path):
+    doc = Document(str(path))
+    paragraphs = [(paragraph.text, paragraph.style.name, paragraph.alignment) for paragraph in doc.paragraphs]
+    tables = [[cell.text for row in table.rows for cell in row.cells] for table in doc.tables]
+    return paragraphs, tables, len(doc.inline_shapes)
+
+@pytest.fixture(scope='module')
+def outputs(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp('backends')
+    return generate('docx', tmp_path), generate('ooxml', tmp_path)
+
+def test_same_reports(outputs):
+    docx_folder, ooxml_folder = outputs
+    reports = sorted(name for name in os.listdir(docx_folder) if name.endswith('.docx'))
+    assert reports
+    assert reports == sorted(name for name in os.listdir(ooxml_folder) if name.endswith('.docx'))
+
+def test_same_package_parts(outputs):
+    docx_folder, ooxml_folder = outputs
+    for name in sorted(os.listdir(docx_folder)):
+        if not name.endswith('.docx'):
+            continue
+        with zipfile.ZipFile(docx_folder / name) as expected, zipfile.ZipFile(ooxml_folder / name) as actual:
+            assert set(expected.namelist()) == set(actual.namelist()), name
+            for part in expected.namelist():
+                if part == 'docProps/core.xml':
+                    continue  # Holds the creation time
+                if part.endswith('.xml') or part.endswith('.rels'):
+                    # document.xml, the rels and [Content_Types].xml
+                    assert canonical_xml(expected.read(part)) == canonical_xml(actual.read(part)), (name, part)
+                else:
+                    assert expected.read(part) == actual.read(part), (name, part)
+
+def test_same_document_text(outputs):
+    docx_folder, ooxml_folder = outputs
+    for name in sorted(os.listdir(docx_folder)):
+        if name.endswith('.docx'):
+            assert document_text(docx_folder / name) == document_text(ooxml_folder / name), name
\ No newline at end of file
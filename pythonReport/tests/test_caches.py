@@ -0,0 +1,67 @@
+"""Disk caches stay bounded across batches"""
+import os
+import shutil
+
+import pytest
+
+from ReportGenerator import PHOTO_CHECKS_NAME, ImageCache, PhotoValidator, PlaceholderCache
+from conftest import IMAGES_FOLDER
+
+def write_entry(path, size, mtime):
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    os.utime(path, (mtime, mtime))
+
+def test_image_cache_evicts_least_recently_used(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=250)
+    for number in range(5):
+        write_entry(tmp_path / f"{number:040x}.img", 100, 1000 + number)
+    write_entry(tmp_path / PHOTO_CHECKS_NAME, 1000, 0)
+    write_entry(tmp_path / f"{0:040x}.img.123.tmp", 1000, 0)
+    write_entry(tmp_path / 'LICENSE', 1000, 0)
+    cache.evict()
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{3:040x}.img", f"{4:040x}.img", PHOTO_CHECKS_NAME,
+                                                   f"{0:040x}.img.123.tmp", 'LICENSE'])
+
+def test_image_cache_read_marks_entry_used(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=150)
+    write_entry(tmp_path / f"{0:040x}.img", 100, 1000)
+    write_entry(tmp_path / f"{1:040x}.img", 100, 2000)
+    assert cache.load_from_disk(f"{0:040x}") == b'x' * 100
+    cache.evict()
+    assert os.listdir(tmp_path) == [f"{0:040x}.img"]
+
+@pytest.mark.skipif(not os.path.isdir(IMAGES_FOLDER), reason="sample photos/ not available")
+def test_image_cache_memory_is_bounded(tmp_path):
+    photos = [os.path.join(IMAGES_FOLDER, 'header.png'), os.path.join(IMAGES_FOLDER, 'footer.png')]
+    sizes = [len(ImageCache().get(photo, (1, 1)).getvalue()) for photo in photos]
+    cache = ImageCache(str(tmp_path), memory_max_bytes=max(sizes))
+    for photo in photos:
+        cache.get(photo, (1, 1))
+    assert list(cache.entries) == [cache.cache_key(photos[1], (1, 1))]
+    assert cache.memory_bytes == sizes[1]
+    # The dropped entry is still served, from the disk copy
+    assert cache.get(photos[0], (1, 1)).getvalue() == ImageCache().get(photos[0], (1, 1)).getvalue()
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_placeholder_cache_still_evicts(tmp_path):
+    cache = PlaceholderCache(str(tmp_path), max_bytes=150)
+    write_entry(tmp_path / 'old.jpg', 100, 1000)
+    write_entry(tmp_path / 'new.jpg', 100, 2000)
+    cache.evict()
+    assert os.listdir(tmp_path) == ['new.jpg']
+
+@pytest.mark.skipif(not os.path.isdir(IMAGES_FOLDER), reason="sample photos/ not available")
+def test_photo_checks_forget_deleted_photos(tmp_path):
+    photos = [os.path.join(IMAGES_FOLDER, 'header.png'), os.path.join(IMAGES_FOLDER, 'footer.png')]
+    old_batch = tmp_path / 'old_batch'
+    old_batch.mkdir()
+    old_photo = str(old_batch / 'front.png')
+    shutil.copy(photos[0], old_photo)
+    
+    PhotoValidator(str(tmp_path / 'cache')).validate([old_photo])
+    shutil.rmtree(old_batch)
+    validator = PhotoValidator(str(tmp_path / 'cache'))
+    assert old_photo in validator.checks
+    validator.validate(photos)
+    assert sorted(PhotoValidator(str(tmp_path / 'cache')).checks) == sorted(photos)
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""Claim rows are normalized into ClaimRecords a block at a time"""
+import datetime
+
+import openpyxl
+
+from ReportGenerator import iter_claims
+
+COLUMNS = ['CLAIM #', 'INSURED/POLICYHOLDER', 'ADDRESS', 'DATE OF LOSS', 'SCOPE OF WORK']
+
+def write_workbook(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(COLUMNS)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+def test_dates_with_gaps_in_the_block(tmp_path):
+    path = write_workbook(tmp_path / 'claims.xlsx', [
+        ['PR1', 'ABIGAIL CARTER', 'SCARBOROUGH, ON', 'MARCH 12, 2025', None],
+        ['PR2', 'MICHAEL LEE', 'MISSISSAUGA, ON', None, None],
+        ['PR3', 'PRIYA SHAH', 'BRAMPTON, ON', 'TBD', None],
+        ['PR4', 'OMAR HASSAN', 'ETOBICOKE, ON', datetime.datetime(2025, 3, 5), None],
+        ['PR5', 'EMILY WONG', 'NORTH YORK, ON', '04/03/2025', None],
+        ['PR6', 'LUCAS MARTIN', 'TORONTO, ON', 2025, None],
+    ])
+    dates = [claim.loss_date for _, claim in iter_claims(path)]
+    assert dates == ['MARCH 12, 2025', 'Unknown', 'TBD', 'MARCH 5, 2025', '04/03/2025', '2025']
+
+def test_defaults_scope_and_filename(tmp_path):
+    path = write_workbook(tmp_path / 'claims.xlsx', [
+        ['PR1923', 'ABIGAIL CARTER', 'SCARBOROUGH, ON M1C 2Z3', None, '1. Extract water.<br>2. Dry structure.<br> '],
+        ['PR2145', '  ', None, None, 'Pack out items\n2. Clean soot'],
+        [None, None, None, None, None],
+        ['PR2298', 'PRIYA SHAH', 'BRAMPTON, ON', None, None],
+    ])
+    claims = [claim for _, claim in iter_claims(path)]
+    assert len(claims) == 3  # The blank row is dropped
+    first, second, third = claims
+    assert first.scope_items == ('Extract water.', 'Dry structure.')
+    assert first.filename == "FIRST INSPECTION REPORT - CLAIM# PR1923 - ABIGAIL - SCARBOROUGH_ON_M1C_2Z3.docx"
+    assert second.insured == 'Unknown' and second.address == 'Unknown' and second.cause == 'Unknown cause of loss'
+    assert second.scope_items == ('Pack out items', 'Clean soot')
+    assert second.filename == "FIRST INSPECTION REPORT - CLAIM# PR2145 - UNKNOWN - UNKNOWN.docx"
+    assert third.scope_items == ()
+    assert third.inspection_date == 'Unknown'
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""Packaging options give the same report whether or not python-docx's private writer API is there"""
+import io
+import zipfile
+
+import ReportGenerator
+from ReportGenerator import PackagingOptions, iter_claims, save_docx_package
+from conftest import INPUT_FILE, needs_sample_data
+
+pytestmark = needs_sample_data
+
+PACKAGING = PackagingOptions(store_media=True, deflate_level=1)
+
+def build_document(engine):
+    _, claim = next(iter_claims(INPUT_FILE))
+    return engine.build_report(claim)
+
+def package_entries(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as package:
+        return [(info.filename, info.compress_type, package.read(info)) for info in package.infolist()
+                if info.filename != 'docProps/core.xml']
+
+def save(doc):
+    stream = io.BytesIO()
+    save_docx_package(doc, stream, PACKAGING)
+    return stream.getvalue()
+
+def test_fallback_without_private_writer_api(engine, monkeypatch):
+    doc = build_document(engine)
+    expected = package_entries(save(doc))
+    assert any(compress_type == zipfile.ZIP_STORED for _, compress_type, _ in expected)
+    
+    # As if python-docx had dropped the private helpers save_docx_package uses
+    monkeypatch.setattr(ReportGenerator, 'PackageWriter', type('PackageWriter', (), {}))
+    assert package_entries(save(doc)) == expected
\ No newline at end of file
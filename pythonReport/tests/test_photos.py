@@ -0,0 +1,22 @@
+"""Claims are matched to their photo folders"""
+import os
+
+import openpyxl
+from docx import Document
+
+from conftest import make_engine
+
+def test_claim_without_folder_gets_default_rooms(tmp_path):
+    workbook = openpyxl.Workbook()
+    workbook.active.append(['CLAIM #', 'INSURED/POLICYHOLDER', 'ADDRESS'])
+    workbook.active.append(['PR1923', 'ABIGAIL CARTER', 'SCARBOROUGH, ON'])
+    workbook.save(tmp_path / 'claims.xlsx')
+    (tmp_path / 'photos' / 'PR2145').mkdir(parents=True)
+    os.mkdir(tmp_path / 'out')
+    
+    engine = make_engine(tmp_path, tmp_path / 'out', tmp_path / 'photos', per_claim_folders=True)
+    result, = engine.generate_reports(str(tmp_path / 'claims.xlsx'))
+    headings = [paragraph.text for paragraph in Document(result.path).paragraphs
+                if paragraph.style.name == 'Heading 2' and paragraph.text.endswith(' AREA')]
+    assert headings == ['KITCHEN AREA', 'DINING AREA', 'LIVING AREA', 'BEDROOM1 AREA', 'BEDROOM2 AREA',
+                        'BATHROOM AREA', 'STORAGE AREA', 'BASEMENT AREA', 'GARAGE AREA']
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""A worker process dying fails only the claim it was building"""
+import os
+
+import ReportGenerator
+from conftest import INPUT_FILE, needs_sample_data
+
+pytestmark = needs_sample_data
+
+build_claim_in_worker = ReportGenerator._build_claim_in_worker
+
+def build_or_die(index, claim_data):
+    if claim_data.claim_number == 'PR2145':
+        os._exit(1)
+    return build_claim_in_worker(index, claim_data)
+
+def test_dead_worker_fails_one_claim(engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(ReportGenerator, '_build_claim_in_worker', build_or_die)
+    results = engine.generate_reports(INPUT_FILE, workers=2)
+    assert len(results) == 10
+    assert {result.claim for result in results if result.status != 'success'} == {'PR2145'}
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.docx')]) == 9
\ No newline at end of file
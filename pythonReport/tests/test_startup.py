@@ -0,0 +1,11 @@
+"""The command line doesn't load the window's modules"""
+import os
+import subprocess
+import sys
+
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_import_does_not_load_tkinter():
+    check = "import sys, ReportGenerator; print('tkinter' in sys.modules)"
+    output = subprocess.run([sys.executable, '-c', check], cwd=MODULE_DIR, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == 'False'
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""Watch mode picks up changed photos and survives folders changing under it"""
+import os
+import shutil
+
+import pytest
+
+from ReportGenerator import ClaimWatcher
+from conftest import IMAGES_FOLDER, INPUT_FILE, make_engine, needs_sample_data
+
+pytestmark = needs_sample_data
+
+@pytest.fixture
+def watcher(tmp_path):
+    images_folder = tmp_path / 'photos'
+    shutil.copytree(IMAGES_FOLDER, images_folder)
+    output_folder = tmp_path / 'output'
+    output_folder.mkdir()
+    engine = make_engine(tmp_path, output_folder, images_folder)
+    watcher = ClaimWatcher(engine, INPUT_FILE, settle_seconds=1)
+    watcher.input_state = os.stat(INPUT_FILE).st_mtime_ns, os.stat(INPUT_FILE).st_size
+    assert watcher.run_pass(reread=True)
+    return watcher
+
+def test_idle_poll_runs_nothing(watcher):
+    assert not watcher.poll(now=0)
+    assert not watcher.poll(now=10)
+
+def test_photo_saved_over_in_place(watcher):
+    index = watcher.engine.photo_index
+    room = index.room_names()[0]
+    photo = index.room_photos(room)[0]
+    stat = os.stat(photo)
+    os.utime(photo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    
+    assert not watcher.poll(now=0)  # Seen, waiting for it to settle
+    assert watcher.poll(now=2)
+    assert watcher.results[-1].status == 'success'
+
+def test_scan_error_keeps_watching(watcher, monkeypatch):
+    def fail(check_images=False):
+        raise FileNotFoundError("room folder removed mid-scan")
+    
+    built = len(watcher.results)
+    monkeypatch.setattr(watcher.engine.photo_index, 'refresh', fail)
+    assert not watcher.poll(now=0)
+    monkeypatch.undo()
+    assert not watcher.poll(now=0.5)  # Still settling after the failed scan
+    assert watcher.poll(now=2)
+    assert len(watcher.results) == built  # Nothing actually changed, so no claims were rebuilt
\ No newline at end of file